@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Control hot-path benchmarks
+Times publishing, interpolation, scene playback, symmetric input and pose file I/O headless against an in-process fake Redis
+
+Usage:
+    python benchmarks/hot_paths.py                                  # Full suite, table on stdout
+    python benchmarks/hot_paths.py --quick --filter publish,interp
+    python benchmarks/hot_paths.py --json results.json --baseline benchmarks/baseline.json
+    python benchmarks/hot_paths.py --save-baseline benchmarks/baseline.json
+    python benchmarks/hot_paths.py --spawn                          # Also publish to a throwaway redis-server
+
+A run compared against --baseline exits with status 1 if any case is slower
+than the baseline by more than --tolerance. Baselines are machine specific and
+not committed: record one once per machine (e.g. the robot laptop) with
+--save-baseline, then compare builds against it on that machine.
+"""
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+
+import numpy as np
+import redis
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from joint_state import JointStateStore  # noqa: E402
+from joint_view import JointSliderView  # noqa: E402
+from mimic_obs_codec import MIMIC_OBS_KEY, MimicObsEncoder, frame_metadata_key  # noqa: E402
+from motion_engine import MotionEngine  # noqa: E402
+from motion_profiles import MotionLimits  # noqa: E402
+from pose_library import PoseLibrary  # noqa: E402
+from pose_math import JOINT_LOWER, JOINT_NAMES, JOINT_UPPER, LEFT_JOINTS  # noqa: E402
+from pose_store import PoseYamlStore  # noqa: E402
+from redis_link import FrameOutput, RedisLink  # noqa: E402
+from redis_transport import SPAWN_PORT, spawn_redis_server  # noqa: E402
+
+NUM_JOINTS = 29
+POSE_COUNTS = (10, 100, 1000, 10000)
+QUICK_POSE_COUNTS = (10, 100, 1000)
+
+
+# ==================== Timing ====================
+
+def time_case(op, rounds=5, round_time=0.05):
+    """Per-call seconds of op() for each of `rounds` rounds (calls per round calibrated to round_time)"""
+    op()  # Warm up caches and lazy initialization
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            op()
+        elapsed = time.perf_counter() - start
+        if elapsed >= round_time or number >= 1 << 20:
+            break
+        number = min(number * max(2, int(round_time / max(elapsed, 1e-9) * 1.2)), 1 << 20)
+
+    per_call = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(number):
+            op()
+        per_call.append((time.perf_counter() - start) / number)
+    return per_call, number
+
+
+def summarize(per_call, number):
+    values = np.array(per_call) * 1e6
+    return {
+        'median_us': float(np.median(values)),
+        'min_us': float(values.min()),
+        'max_us': float(values.max()),
+        'rounds': len(values),
+        'calls_per_round': number,
+    }
+
+
+# ==================== Cases ====================
+# Each case factory returns (name, op) pairs; op() runs one unit of work.
+
+def fake_redis_client():
+    """In-process Redis (fakeredis), or None if it is not installed"""
+    try:
+        import fakeredis
+    except ImportError:
+        return None
+    return fakeredis.FakeRedis()
+
+
+def connected_link(client):
+    """A RedisLink whose writes go to client (no background connection thread)"""
+    link = RedisLink()
+    link.client = client
+    link.connected = link.ever_connected = True
+    return link
+
+
+def publish_cases(client, suffix):
+    """Encode + write one frame, as publish_to_redis does"""
+    link = connected_link(client)
+    cases = []
+    for label, encoding, metadata in (("json", "json", None), ("f32", "f32", None),
+                                      ("f32-meta-key", "f32", "key"), ("f32-header", "f32", "header")):
+        encoder = MimicObsEncoder(encoding, stamped=metadata == "header")
+        output = FrameOutput(MIMIC_OBS_KEY, meta_key=frame_metadata_key(MIMIC_OBS_KEY) if metadata == "key" else None)
+        angles = np.linspace(-0.5, 0.5, NUM_JOINTS)
+        state = {'seq': 0}
+
+        def op(encoder=encoder, output=output, angles=angles, state=state):
+            state['seq'] += 1
+            now = time.monotonic()
+            encoder.update(angles)
+            if encoder.stamped:
+                encoder.stamp(state['seq'], now)
+            if not link.write_frame(output, encoder.payload(), state['seq'], now):
+                raise RuntimeError("Redis write failed")
+
+        cases.append((f"publish/{label}@{suffix}", op))
+    return cases
+
+
+def encode_cases():
+    """Serialization alone (no Redis)"""
+    cases = []
+    for encoding in ("json", "f32", "f64"):
+        encoder = MimicObsEncoder(encoding)
+        angles = np.linspace(-0.5, 0.5, NUM_JOINTS)
+        cases.append((f"encode/{encoding}", lambda encoder=encoder, angles=angles: encoder.encode(angles)))
+    return cases
+
+
+class ManualClock:
+    """Clock advanced by the benchmark (one publish period per tick)"""
+
+    def __init__(self, step=0.02):
+        self.now = 0.0
+        self.step = step
+
+    def __call__(self):
+        return self.now
+
+    def tick(self):
+        self.now += self.step
+        return self.now
+
+
+def new_engine(profile="linear"):
+    clock = ManualClock()
+    engine = MotionEngine(JointStateStore(np.zeros(NUM_JOINTS)), clock=clock, profile=profile,
+                          limits=MotionLimits(2.0, 8.0))
+    return engine, clock
+
+
+def interpolation_cases():
+    """One publisher tick during a move (interpolate + commit)"""
+    cases = []
+    target = np.linspace(-0.3, 0.3, NUM_JOINTS)
+    for profile in ("linear", "min_jerk", "trapezoidal"):
+        engine, clock = new_engine(profile)
+        engine.move_to(target, 1e9, "Benchmark")  # Long enough to stay in progress
+        cases.append((f"interp/{profile}", lambda engine=engine, clock=clock: engine.tick(clock.tick())))
+    return cases
+
+
+def scene_cases():
+    """One publisher tick of a looping scene (segment lookup, sampling, track merge, events)"""
+    rng = np.random.default_rng(0)
+    poses = {f"pose_{i}": np.clip(rng.uniform(-0.5, 0.5, NUM_JOINTS), JOINT_LOWER, JOINT_UPPER) for i in range(4)}
+    steps = [{'pose_name': name, 'hold_time': 0.3, 'interp_time': 0.5} for name in poses]
+    cases = []
+    for label, tracks in (("1-track", None),
+                          ("3-tracks", {'left_arm': steps[:2], 'right_arm': steps[2:]})):
+        engine, clock = new_engine()
+        engine.play_scene(steps, poses, loop=True, first_interp_time=0.5, tracks=tracks)
+
+        def op(engine=engine, clock=clock):
+            engine.tick(clock.tick())
+            while not engine.events.empty():  # The GUI drains these every frame
+                engine.events.get_nowait()
+
+        cases.append((f"scene/{label}", op))
+    return cases
+
+
+def symmetric_cases():
+    """Three left sliders dragged in symmetric mode: input, mirror + commit, view redraw"""
+    try:
+        from gui_joint_controller import JointControllerGUI
+    except ImportError as e:  # No tkinter
+        print(f"⚠️  Skipping symmetric benchmark: {e}")
+        return []
+
+    widget = types.SimpleNamespace(set=lambda value: None, config=lambda **kwargs: None)
+    engine, _ = new_engine()
+    gui = types.SimpleNamespace(
+        joint_view=JointSliderView([widget] * NUM_JOINTS, [widget] * NUM_JOINTS, JOINT_LOWER, JOINT_UPPER,
+                                   lambda rad: f"{rad:+.3f} rad ({np.rad2deg(rad):+.1f}°)", np.zeros(NUM_JOINTS)),
+        pending_input=np.full(NUM_JOINTS, np.nan),
+        symmetric_mode=True,
+        motion_engine=engine,
+    )
+    joints = [int(i) for i in LEFT_JOINTS[:3]]
+    state = {'value': 0.0}
+
+    def op():
+        state['value'] = 0.1 if state['value'] != 0.1 else 0.2
+        for idx in joints:
+            JointControllerGUI.update_joint(gui, idx, state['value'])
+        JointControllerGUI.flush_input(gui)
+        gui.joint_view.render(engine.joint_state.angles)
+
+    return [("symmetric/update", op)]
+
+
+def make_pose(rng):
+    return {
+        'angles': np.round(rng.uniform(-0.5, 0.5, NUM_JOINTS), 4).tolist(),
+        'joint_names': list(JOINT_NAMES),
+        'timestamp': "2025-01-01 12:00:00",
+        'description': "Benchmark pose",
+    }
+
+
+def pose_file_cases(tmp_dir, counts):
+    """Load a pose file into a fresh PoseLibrary; save one pose into a library of N"""
+    rng = np.random.default_rng(0)
+    cases = []
+    for count in counts:
+        path = Path(tmp_dir) / f"poses_{count}.yaml"
+        store = PoseYamlStore(path, list(JOINT_NAMES))
+        store.dump_all({f"pose_{i}": make_pose(rng) for i in range(count)})
+
+        def load(path=path):
+            library = PoseLibrary(PoseYamlStore(path, list(JOINT_NAMES)), NUM_JOINTS)
+            library.refresh()
+
+        library = PoseLibrary(PoseYamlStore(path, list(JOINT_NAMES)), NUM_JOINTS)
+        library.refresh()
+        pose = make_pose(rng)
+        cases.append((f"pose_yaml/load-{count}", load))
+        cases.append((f"pose_yaml/save-{count}", lambda library=library, pose=pose: library.save("pose_0", pose)))
+    return cases
+
+
+# ==================== Running and comparing ====================
+
+def collect_cases(args, tmp_dir, redis_clients):
+    cases = encode_cases()
+    for suffix, client in redis_clients:
+        cases += publish_cases(client, suffix)
+    cases += interpolation_cases()
+    cases += scene_cases()
+    cases += symmetric_cases()
+    cases += pose_file_cases(tmp_dir, QUICK_POSE_COUNTS if args.quick else POSE_COUNTS)
+    if args.filter:
+        prefixes = [prefix.strip() for prefix in args.filter.split(",") if prefix.strip()]
+        cases = [(name, op) for name, op in cases if any(name.startswith(prefix) for prefix in prefixes)]
+    return cases
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'date': time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Rows of (name, baseline us, current us, change) and the names that regressed
+
+    Cases are compared on their fastest round, which is far less sensitive to
+    other load on the machine than the median.
+    """
+    rows, regressions = [], []
+    for name, stats in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            rows.append((name, None, stats['min_us'], None))
+            continue
+        change = stats['min_us'] / reference['min_us'] - 1.0
+        rows.append((name, reference['min_us'], stats['min_us'], change))
+        if change > tolerance:
+            regressions.append(name)
+    return rows, regressions
+
+
+def print_table(results, rows=None, budget_s=0.02):
+    print(f"\n{'case':<30} {'median (us)':>12} {'min (us)':>10} {'of 50 Hz':>9}"
+          + ("  base min   change" if rows else ""))
+    changes = {row[0]: row for row in rows or []}
+    for name, stats in results.items():
+        line = (f"{name:<30} {stats['median_us']:>12.1f} {stats['min_us']:>10.1f} "
+                f"{stats['median_us'] / (budget_s * 1e6) * 100:>8.2f}%")
+        if name in changes:
+            _, reference, _, change = changes[name]
+            line += "  (new)" if reference is None else f"  {reference:>8.1f}  {change * 100:+6.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the controller's hot paths (headless)")
+    parser.add_argument("--filter", help="Comma-separated case name prefixes (e.g. publish,pose_yaml/load)")
+    parser.add_argument("--quick", action="store_true", help="Fewer rounds and no 10000-pose files")
+    parser.add_argument("--rounds", type=int, default=None, help="Timed rounds per case (default 7, quick 3)")
+    parser.add_argument("--json", help="Write results (and environment) to this JSON file")
+    parser.add_argument("--baseline", help="Compare against a results JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.3,
+                        help="Allowed slowdown vs the baseline before failing (default 0.3 = 30%%)")
+    parser.add_argument("--save-baseline", help="Write these results as the new baseline file")
+    parser.add_argument("--redis", metavar="HOST:PORT", help="Also publish to this running redis-server")
+    parser.add_argument("--spawn", action="store_true", help="Also publish to a throwaway redis-server on --port")
+    parser.add_argument("--port", type=int, default=SPAWN_PORT)
+    args = parser.parse_args()
+    rounds = args.rounds or (3 if args.quick else 7)
+    baseline = None
+    if args.baseline:
+        try:
+            with open(args.baseline, 'r') as f:
+                baseline = json.load(f)
+        except FileNotFoundError:
+            sys.exit(f"No baseline at {args.baseline}; record one on this machine with --save-baseline")
+
+    redis_clients = []
+    fake = fake_redis_client()
+    if fake is None:
+        print("⚠️  fakeredis is not installed; skipping in-process publish benchmarks (pip install fakeredis)")
+    else:
+        redis_clients.append(("fake", fake))
+
+    proc = None
+    if args.spawn:
+        socket_dir = tempfile.TemporaryDirectory()
+        proc = spawn_redis_server(args.port, Path(socket_dir.name) / "redis.sock")
+        args.redis = f"localhost:{args.port}"
+    if args.redis:
+        host, _, port = args.redis.partition(":")
+        client = redis.Redis(host=host or "localhost", port=int(port or 6379))
+        try:
+            client.ping()
+            redis_clients.append(("redis", client))
+        except redis.ConnectionError as e:
+            print(f"⚠️  Skipping redis-server benchmarks ({args.redis}): {e}")
+
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for name, op in collect_cases(args, tmp_dir, redis_clients):
+                per_call, number = time_case(op, rounds=rounds)
+                results[name] = summarize(per_call, number)
+                print(f"  {name:<30} {results[name]['median_us']:>12.1f} us", flush=True)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+            socket_dir.cleanup()
+
+    document = {'environment': environment(), 'results': results}
+    regressions = []
+    rows = None
+    if args.baseline:
+        recorded = baseline.get('environment') or {}
+        differs = [key for key in ('python', 'numpy', 'platform', 'machine')
+                   if recorded.get(key) != document['environment'][key]]
+        if differs:
+            print(f"⚠️  Warning: Baseline was recorded in a different environment ({', '.join(differs)}); "
+                  f"timings are not comparable")
+        rows, regressions = compare(results, baseline.get('results', {}), args.tolerance)
+        document['baseline'] = {'path': args.baseline, 'environment': baseline.get('environment'),
+                                'tolerance': args.tolerance, 'regressions': regressions}
+    print_table(results, rows)
+
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(document if path == args.json else {'environment': document['environment'],
+                                                              'results': results}, f, indent=2)
+                f.write("\n")
+            print(f"Results written to {path}")
+
+    if regressions:
+        print(f"\n⚠️  {len(regressions)} case(s) slower than the baseline by more than "
+              f"{args.tolerance * 100:.0f}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
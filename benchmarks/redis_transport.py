@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Redis transport latency benchmark
+Publishes N mimic_obs frames over TCP and over a Unix domain socket and reports SET latency
+
+Usage:
+    # Against a running redis-server (enable its socket with `unixsocket /tmp/redis.sock`)
+    python benchmarks/redis_transport.py --unix-socket /tmp/redis.sock
+
+    # Start a throwaway redis-server listening on both transports (port 6390, not the robot's 6379)
+    python benchmarks/redis_transport.py --spawn
+"""
+import argparse
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import redis
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from mimic_obs_codec import ENCODINGS, MIMIC_OBS_KEY, MimicObsEncoder  # noqa: E402
+from redis_link import create_pool, describe_endpoint  # noqa: E402
+
+SPAWN_PORT = 6390  # Away from the default 6379, which may be the robot's live Redis
+
+
+def measure_set_latency(client, encoder, frames, warmup=200):
+    """Time `frames` SETs of the mimic_obs key; returns latencies in microseconds"""
+    dof_pos = np.zeros(29)
+    latencies = np.empty(frames)
+    for i in range(warmup + frames):
+        dof_pos[i % 29] += 0.001
+        payload = encoder.encode(dof_pos)
+        start = time.perf_counter()
+        client.set(MIMIC_OBS_KEY, payload)
+        if i >= warmup:
+            latencies[i - warmup] = time.perf_counter() - start
+    return latencies * 1e6
+
+
+def summarize(latencies):
+    return {
+        'p50_us': float(np.percentile(latencies, 50)),
+        'p99_us': float(np.percentile(latencies, 99)),
+        'mean_us': float(np.mean(latencies)),
+        'max_us': float(np.max(latencies)),
+    }
+
+
+def spawn_redis_server(port, socket_path):
+    """Start a temporary redis-server without persistence
+
+    Readiness is checked over its own Unix socket, so another server already
+    listening on `port` is never mistaken for it (the spawned one exits).
+    """
+    server = shutil.which("redis-server")
+    if server is None:
+        sys.exit("redis-server not found in PATH")
+    proc = subprocess.Popen(
+        [server, "--port", str(port), "--unixsocket", str(socket_path), "--unixsocketperm", "700",
+         "--save", "", "--appendonly", "no"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    client = redis.Redis(unix_socket_path=str(socket_path))
+    for _ in range(100):
+        if proc.poll() is not None:
+            sys.exit(f"redis-server exited with status {proc.returncode} (is port {port} already in use?)")
+        try:
+            client.ping()
+            return proc
+        except redis.ConnectionError:
+            time.sleep(0.05)
+    proc.terminate()
+    sys.exit("redis-server did not start")
+
+
+def run(args):
+    """Benchmark each configured transport and return {endpoint: stats}"""
+    transports = [dict(host=args.host, port=args.port)]
+    if args.unix_socket:
+        transports.append(dict(unix_socket_path=args.unix_socket))
+
+    results = {}
+    for transport in transports:
+        endpoint = describe_endpoint(**transport)
+        client = redis.Redis(connection_pool=create_pool(**transport))
+        try:
+            client.ping()
+        except redis.ConnectionError as e:
+            print(f"⚠️  Skipping {endpoint}: {e}")
+            continue
+
+        latencies = measure_set_latency(client, MimicObsEncoder(args.encoding), args.frames)
+        results[endpoint] = summarize(latencies)
+        client.connection_pool.disconnect()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Redis SET latency over TCP and Unix sockets")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6379)
+    parser.add_argument("--unix-socket", default=None, help="Redis Unix socket path")
+    parser.add_argument("--frames", type=int, default=10000)
+    parser.add_argument("--encoding", choices=ENCODINGS, default="json")
+    parser.add_argument("--spawn", action="store_true",
+                        help="Start a temporary redis-server on --spawn-port and a temp Unix socket")
+    parser.add_argument("--spawn-port", type=int, default=SPAWN_PORT,
+                        help=f"TCP port of the --spawn server (default: {SPAWN_PORT})")
+    args = parser.parse_args()
+
+    proc = None
+    tmp_dir = None
+    if args.spawn:
+        tmp_dir = tempfile.TemporaryDirectory()
+        args.unix_socket = str(Path(tmp_dir.name) / "redis.sock")
+        proc = spawn_redis_server(args.spawn_port, args.unix_socket)
+        args.host, args.port = "localhost", args.spawn_port
+
+    try:
+        results = run(args)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+            tmp_dir.cleanup()
+
+    print(f"\nSET latency, {args.frames} frames, encoding={args.encoding}")
+    print(f"{'endpoint':<32} {'p50 (us)':>10} {'p99 (us)':>10} {'mean (us)':>10} {'max (us)':>10}")
+    for endpoint, stats in results.items():
+        print(f"{endpoint:<32} {stats['p50_us']:>10.1f} {stats['p99_us']:>10.1f} "
+              f"{stats['mean_us']:>10.1f} {stats['max_us']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
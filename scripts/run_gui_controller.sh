@@ -18,7 +18,7 @@ echo "=============================================="
 echo "  TWIST2 GUI Joint Controller"
 echo "=============================================="
 echo ""
-echo "  Publishing to Redis at 50Hz"
+echo "  Publishing to Redis at 50Hz (adjustable in the GUI)"
 echo "  Robot type: unitree_g1_with_hands (29 DOF)"
 echo ""
 echo "Usage:"
@@ -34,5 +34,12 @@ echo "  - twist2 environment activated (conda or venv)"
 echo "  - tkinter installed (sudo apt install python3.8-tk)"
 echo "  - TWIST2 low-level server running for real robot"
 echo ""
+echo "Profiling (options are passed through to the GUI):"
+echo "  --cprofile [tk|publisher|all]  cProfile the Tk and/or publisher thread"
+echo "  --sample [HZ]                  Low-overhead stack sampling (default 200 Hz)"
+echo "  --tracemalloc [SECONDS]        Memory snapshots (default every 60 s)"
+echo "  --profile-dir DIR              Output directory (default profiles/<date-time>)"
+echo "  Data is written on exit and on 'kill -USR1 <pid>'"
+echo ""
 
-$PYTHON_PATH src/gui_joint_controller.py
+$PYTHON_PATH src/gui_joint_controller.py "$@"
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Command stream probe for the TWIST2 joint controller
+Reads the published mimic_obs back and reports command age, dropped/duplicated frames and a latency histogram
+
+Frames must be stamped (redis.frame_metadata "key" or "header", the "stream"
+output, or the shm backend). Timestamps are the publisher's time.monotonic(),
+so the probe has to run on the same host as the GUI.
+
+Usage:
+    python src/frame_probe.py                       # Poll the key for 30 s
+    python src/frame_probe.py --source stream --budget-ms 20 --duration 600
+    python src/frame_probe.py --source shm --json
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import redis
+import yaml
+
+from mimic_obs_codec import MIMIC_OBS_KEY, decode_frame_metadata, decode_mimic_obs_frame, frame_metadata_key
+from redis_link import create_pool, describe_endpoint
+
+SOURCES = ("key", "stream", "shm")
+
+# Upper bucket edges of the latency histogram (ms); the last bucket is open-ended
+LATENCY_BUCKETS_MS = (0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class FrameProbe:
+    """Sequence and timing bookkeeping for observed frames
+
+    Each observation is one read of the stream: a new frame, or (when polling
+    a key) the same frame read again. Latency is measured once per frame, when
+    it is first seen; command age at every read, so it also covers the time a
+    consumer would act on a frame before the next one arrives.
+    """
+
+    def __init__(self, polling=True):
+        self.polling = polling  # Re-reading the current frame is expected when polling a key
+        self.last_seq = None
+        self.last_stamp = None
+
+        self.frames = 0       # Distinct frames seen
+        self.reads = 0        # Stamped reads (including re-reads of the same frame)
+        self.unstamped = 0    # Reads without seq/timestamp
+        self.dropped = 0      # Sequence numbers skipped (never observed)
+        self.duplicated = 0   # Frames seen twice or out of order
+        self.restarts = 0     # Publisher restarts (sequence started over)
+
+        self.latencies = []   # Seconds, one per new frame
+        self.ages = []        # Seconds, one per read
+
+    def observe(self, seq, stamp, received_at):
+        """Account for one read of a frame published with (seq, stamp)"""
+        if seq is None or stamp is None:
+            self.unstamped += 1
+            return
+        self.reads += 1
+        self.ages.append(received_at - stamp)
+
+        if self.last_seq is not None:
+            if seq == self.last_seq and stamp == self.last_stamp and self.polling:
+                return  # Same frame, read again
+            if seq <= self.last_seq:
+                if stamp > self.last_stamp and seq < self.last_seq:
+                    self.restarts += 1  # Newer frame with a smaller number: the publisher restarted
+                else:
+                    self.duplicated += 1
+                    return
+            else:
+                self.dropped += seq - self.last_seq - 1
+
+        self.last_seq = seq
+        self.last_stamp = stamp
+        self.frames += 1
+        self.latencies.append(received_at - stamp)
+
+    def histogram(self):
+        """Frame counts per LATENCY_BUCKETS_MS bucket (plus one overflow bucket)"""
+        latencies_ms = np.asarray(self.latencies) * 1000.0
+        edges = np.asarray(LATENCY_BUCKETS_MS, dtype=np.float64)
+        return np.bincount(np.searchsorted(edges, latencies_ms), minlength=len(edges) + 1)
+
+    def summary(self, budget_ms=None):
+        """Counters and latency/age percentiles (ms) as a dict"""
+        result = {
+            'frames': self.frames,
+            'reads': self.reads,
+            'unstamped': self.unstamped,
+            'dropped': self.dropped,
+            'duplicated': self.duplicated,
+            'restarts': self.restarts,
+            'last_seq': self.last_seq,
+        }
+        for name, samples in (('latency', self.latencies), ('age', self.ages)):
+            values = np.asarray(samples) * 1000.0
+            if len(values):
+                result[f'{name}_p50_ms'] = float(np.percentile(values, 50))
+                result[f'{name}_p99_ms'] = float(np.percentile(values, 99))
+                result[f'{name}_max_ms'] = float(values.max())
+        if budget_ms is not None:
+            ages_ms = np.asarray(self.ages) * 1000.0
+            result['budget_ms'] = budget_ms
+            result['over_budget'] = int(np.count_nonzero(ages_ms > budget_ms))
+        result['histogram_ms'] = dict(zip([f'<={edge:g}' for edge in LATENCY_BUCKETS_MS] + ['>'],
+                                          self.histogram().tolist()))
+        return result
+
+
+def format_report(probe, elapsed, budget_ms=None):
+    """Human-readable report of a probe"""
+    stats = probe.summary(budget_ms)
+    lines = [f"{elapsed:.1f}s: {stats['frames']} frames ({stats['frames'] / max(elapsed, 1e-9):.1f}/s), "
+             f"dropped {stats['dropped']}, duplicated {stats['duplicated']}, restarts {stats['restarts']}"]
+    if stats['unstamped']:
+        lines.append(f"  ⚠️  {stats['unstamped']} reads without seq/timestamp (is redis.frame_metadata set?)")
+    if 'latency_p50_ms' in stats:
+        lines.append(f"  latency  p50 {stats['latency_p50_ms']:.2f} ms  p99 {stats['latency_p99_ms']:.2f} ms  "
+                     f"max {stats['latency_max_ms']:.2f} ms")
+        lines.append(f"  cmd age  p50 {stats['age_p50_ms']:.2f} ms  p99 {stats['age_p99_ms']:.2f} ms  "
+                     f"max {stats['age_max_ms']:.2f} ms")
+    if budget_ms is not None:
+        lines.append(f"  reads older than {budget_ms:g} ms: {stats['over_budget']} of {stats['reads']}")
+
+    counts = probe.histogram()
+    peak = max(int(counts.max()), 1)
+    labels = [f"<= {edge:g} ms" for edge in LATENCY_BUCKETS_MS] + [f" > {LATENCY_BUCKETS_MS[-1]:g} ms"]
+    for label, count in zip(labels, counts):
+        if count:
+            lines.append(f"  {label:>11} {count:>8} {'#' * max(1, int(40 * count / peak))}")
+    return "\n".join(lines)
+
+
+# ==================== Readers ====================
+# Each reader blocks for at most about `timeout` seconds and returns a list of
+# (seq, stamp) observations (empty when nothing arrived).
+
+class KeyReader:
+    """Polls the SET key (and its "<key>:meta" sibling) in one atomic MGET"""
+
+    def __init__(self, client, key, poll_hz=1000.0):
+        self.client = client
+        self.keys = [key, frame_metadata_key(key)]
+        self.poll_period = 1.0 / poll_hz
+
+    def read(self, timeout):
+        payload, meta = self.client.mget(self.keys)
+        if payload is None:
+            time.sleep(min(timeout, 0.1))
+            return []
+        _, seq, stamp = decode_mimic_obs_frame(payload)
+        if seq is None and meta is not None:
+            seq, stamp = decode_frame_metadata(meta)
+        time.sleep(self.poll_period)
+        return [(seq, stamp)]
+
+
+class StreamReader:
+    """Blocks on XREAD for new stream entries (every frame, in order)"""
+
+    def __init__(self, client, stream_key):
+        self.client = client
+        self.stream_key = stream_key
+        self.last_id = "$"
+
+    def read(self, timeout):
+        response = self.client.xread({self.stream_key: self.last_id}, block=max(int(timeout * 1000), 1))
+        observations = []
+        for _, entries in response:
+            for entry_id, fields in entries:
+                self.last_id = entry_id
+                observations.append((int(fields[b'seq']), float(fields[b'ts'])))
+        return observations
+
+
+class ShmReader:
+    """Waits for new frames in the shared memory block"""
+
+    def __init__(self, name):
+        from shm_channel import ShmCommandReader
+        self.reader = ShmCommandReader(name)
+        self.last_seq = None
+
+    def read(self, timeout):
+        frame = self.reader.wait_for_new(self.last_seq, timeout=timeout)
+        if frame is None:
+            return []
+        self.last_seq = frame[0]
+        return [(frame[0], frame[1])]
+
+
+def load_config(path):
+    if path is None:
+        path = Path(__file__).resolve().parent.parent / "config" / "g1.yaml"
+    with open(path, 'r') as f:
+        return yaml.safe_load(f) or {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure age, loss and latency of the published command stream")
+    parser.add_argument("--source", choices=SOURCES, default="key",
+                        help="Read the SET key (polling), the XADD stream or the shared memory block")
+    parser.add_argument("--config", help="Controller config (default: config/g1.yaml)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to measure (0 = until Ctrl-C)")
+    parser.add_argument("--report-interval", type=float, default=5.0, help="Seconds between interim reports")
+    parser.add_argument("--poll-hz", type=float, default=1000.0, help="Key polling rate (keep above the publish rate)")
+    parser.add_argument("--budget-ms", type=float, help="Command age budget; exit status 1 if any read exceeds it")
+    parser.add_argument("--json", action="store_true", help="Print the final summary as one JSON line")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    redis_config = config.get('redis', {})
+    if args.source == "shm":
+        reader = ShmReader(config.get('publisher', {}).get('shm_name', 'twist2_mimic_obs'))
+        endpoint = f"shm:{reader.reader.name}"
+    else:
+        transport = dict(
+            host=redis_config.get('host', 'localhost'),
+            port=redis_config.get('port', 6379),
+            db=redis_config.get('db', 0),
+            unix_socket_path=redis_config.get('unix_socket_path'),
+        )
+        endpoint = describe_endpoint(**transport)
+        client = redis.Redis(connection_pool=create_pool(**transport))
+        if args.source == "key":
+            reader = KeyReader(client, MIMIC_OBS_KEY, args.poll_hz)
+        else:
+            reader = StreamReader(client, redis_config.get('stream_key') or f"{MIMIC_OBS_KEY}:stream")
+
+    probe = FrameProbe(polling=args.source == "key")
+    if not args.json:
+        print(f"Probing {args.source} on {endpoint}" + (" (Ctrl-C to stop)" if not args.duration else ""))
+    start = time.monotonic()
+    next_report = start + args.report_interval
+    try:
+        while not args.duration or time.monotonic() - start < args.duration:
+            for seq, stamp in reader.read(timeout=0.1):
+                probe.observe(seq, stamp, time.monotonic())
+            if not args.json and time.monotonic() >= next_report:
+                print(format_report(probe, time.monotonic() - start, args.budget_ms))
+                next_report += args.report_interval
+    except KeyboardInterrupt:
+        pass
+
+    elapsed = time.monotonic() - start
+    if args.json:
+        print(json.dumps(dict(probe.summary(args.budget_ms), source=args.source, seconds=elapsed)))
+    else:
+        print("\nFinal report")
+        print(format_report(probe, elapsed, args.budget_ms))
+
+    if args.budget_ms is not None and probe.summary(args.budget_ms)['over_budget']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
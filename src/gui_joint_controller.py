@@ -3,20 +3,38 @@
 GUI Joint Controller for TWIST2 G1 Robot
 Manually control robot joints and publish to Redis for testing
 """
+import argparse
 import tkinter as tk
 from tkinter import ttk
 import numpy as np
-import redis
-import json
 import yaml
+import queue
 import threading
 import time
 from pathlib import Path
 
+from mimic_obs_codec import ENCODINGS, MIMIC_OBS_KEY, MimicObsEncoder, frame_metadata_key
+from motion_engine import MotionEngine
+from motion_profiles import PROFILES, MotionLimits
+from pose_library import PoseLibrary
+import pose_math
+from pose_math import GROUP_ALIASES, JOINT_GROUPS, JOINT_LIMITS, JOINT_NAMES, JOINT_PAIRS
+from pose_store import open_stores
+import profiling
+from joint_state import JointStateStore
+from joint_view import JointSliderView
+from layering import HeldPose
+from publish_scheduler import ChangeSuppressor, RateScheduler
+from publisher_telemetry import MetricsExporter, PublisherTelemetry
+from redis_link import FrameOutput, RedisLink
+from shm_channel import SHM_NAME, ShmCommandWriter
+from tk_watchdog import TkStallWatchdog
+
 
 class JointControllerGUI:
-    def __init__(self, root, config_path=None):
+    def __init__(self, root, config_path=None, profiler=None):
         self.root = root
+        self.profiler = profiler  # Optional profiling.ProfileSession
         self.root.title("TWIST2 G1 Joint Controller")
         self.root.geometry("1400x900")  # Wider to accommodate Scene Creator
 
@@ -32,109 +50,157 @@ class JointControllerGUI:
         with open(config_path, 'r') as f:
             self.config = yaml.safe_load(f)
 
-        # Connect to Redis
-        self.redis_client = redis.Redis(host="localhost", port=6379, db=0)
-        try:
-            self.redis_client.ping()
-            self.redis_connected = True
-        except:
-            self.redis_connected = False
-            print("⚠️  Warning: Could not connect to Redis. Publishing disabled.")
-
         # Joint configuration
         self.num_joints = 29
         self.default_angles = np.array(self.config['default_angles'])
-        self.current_angles = self.default_angles.copy()
-
-        # Joint names and ranges (in radians)
-        self.joint_names = [
-            # Legs (0-11)
-            "left_hip_pitch", "left_hip_roll", "left_hip_yaw",
-            "left_knee", "left_ankle_pitch", "left_ankle_roll",
-            "right_hip_pitch", "right_hip_roll", "right_hip_yaw",
-            "right_knee", "right_ankle_pitch", "right_ankle_roll",
-            # Waist (12-14)
-            "waist_yaw", "waist_roll", "waist_pitch",
-            # Arms (15-28)
-            "left_shoulder_pitch", "left_shoulder_roll", "left_shoulder_yaw",
-            "left_elbow", "left_wrist_roll", "left_wrist_pitch", "left_wrist_yaw",
-            "right_shoulder_pitch", "right_shoulder_roll", "right_shoulder_yaw",
-            "right_elbow", "right_wrist_roll", "right_wrist_pitch", "right_wrist_yaw"
-        ]
-
-        # Joint limits from URDF: g1_29dof_rev_1_0.urdf
-        self.joint_limits = [
-            (-2.5307, 2.8798),   # left_hip_pitch
-            (-0.5236, 2.9671),   # left_hip_roll
-            (-2.7576, 2.7576),   # left_hip_yaw
-            (-0.0873, 2.8798),   # left_knee
-            (-0.8727, 0.5236),   # left_ankle_pitch
-            (-0.2618, 0.2618),   # left_ankle_roll
-            (-2.5307, 2.8798),   # right_hip_pitch
-            (-2.9671, 0.5236),   # right_hip_roll
-            (-2.7576, 2.7576),   # right_hip_yaw
-            (-0.0873, 2.8798),   # right_knee
-            (-0.8727, 0.5236),   # right_ankle_pitch
-            (-0.2618, 0.2618),   # right_ankle_roll
-            (-2.618, 2.618),     # waist_yaw
-            (-0.52, 0.52),       # waist_roll
-            (-0.52, 0.52),       # waist_pitch
-            (-3.0892, 2.6704),   # left_shoulder_pitch (-177° to 153°)
-            (-1.5882, 2.2515),   # left_shoulder_roll (-91° to 129°)
-            (-2.618, 2.618),     # left_shoulder_yaw (-150° to 150°)
-            (-1.0472, 2.0944),   # left_elbow (-60° to 120°)
-            (-1.9722, 1.9722),   # left_wrist_roll (-113° to 113°)
-            (-1.6144, 1.6144),   # left_wrist_pitch (-92° to 92°)
-            (-1.6144, 1.6144),   # left_wrist_yaw (-92° to 92°)
-            (-3.0892, 2.6704),   # right_shoulder_pitch (-177° to 153°)
-            (-2.2515, 1.5882),   # right_shoulder_roll (-129° to 91°)
-            (-2.618, 2.618),     # right_shoulder_yaw (-150° to 150°)
-            (-1.0472, 2.0944),   # right_elbow (-60° to 120°)
-            (-1.9722, 1.9722),   # right_wrist_roll (-113° to 113°)
-            (-1.6144, 1.6144),   # right_wrist_pitch (-92° to 92°)
-            (-1.6144, 1.6144),   # right_wrist_yaw (-92° to 92°)
-        ]
+        # Committed snapshots read by the publishing thread (never a half-updated vector)
+        self.joint_state = JointStateStore(self.default_angles)
+        # Motion (interpolation, holds, scenes) runs on the publisher's clock, not in Tk
+        motion_config = self.config.get('motion', {})
+        profile = motion_config.get('profile', 'linear')
+        if profile not in PROFILES:
+            print(f"⚠️  Warning: Unknown interpolation profile '{profile}', falling back to linear")
+            profile = 'linear'
+        self.motion_engine = MotionEngine(
+            self.joint_state,
+            profile=profile,
+            limits=MotionLimits(motion_config.get('max_velocity'), motion_config.get('max_acceleration')),
+            speed=motion_config.get('speed_factor', 1.0)
+        )
+
+        # Joint names, ranges (in radians) and left/right pairs
+        self.joint_names = list(JOINT_NAMES)
+        self.joint_limits = JOINT_LIMITS
 
         # Publishing control
+        publisher_config = self.config.get('publisher', {})
         self.publishing = False
-        self.publish_rate = 50  # Hz
+        self.publish_rate = publisher_config.get('rate_hz', 50)  # Hz
+        self.scheduler = RateScheduler(
+            rate_hz=self.publish_rate,
+            overrun_policy=publisher_config.get('overrun_policy', 'skip'),
+            max_catch_up=publisher_config.get('max_catch_up', 5)
+        )
+        self.output_encoding = publisher_config.get('encoding', 'json')
+        if self.output_encoding not in ENCODINGS:
+            print(f"⚠️  Warning: Unknown encoding '{self.output_encoding}', falling back to json")
+            self.output_encoding = 'json'
+        # Per-frame seq/timestamp for consumers: none, a sibling "<key>:meta" key or the binary header
+        redis_config = self.config.get('redis', {})
+        self.frame_metadata = redis_config.get('frame_metadata')
+        if self.frame_metadata not in (None, 'key', 'header'):
+            print(f"⚠️  Warning: Unknown frame_metadata '{self.frame_metadata}', frames are not stamped")
+            self.frame_metadata = None
+        if self.frame_metadata == 'header' and self.output_encoding == 'json':
+            print("⚠️  Warning: frame_metadata 'header' needs a binary encoding, using the sibling key")
+            self.frame_metadata = 'key'
+        # Preallocated payload buffer, reused by every publish
+        self.obs_encoder = MimicObsEncoder(self.output_encoding, stamped=self.frame_metadata == 'header')
+        # Optional suppression of unchanged frames (heartbeat keeps the consumer alive)
+        self.change_suppressor = ChangeSuppressor(
+            self.num_joints,
+            enabled=publisher_config.get('suppress_unchanged', False),
+            epsilon=publisher_config.get('change_epsilon', 1e-4),
+            heartbeat_hz=publisher_config.get('heartbeat_hz', 5.0)
+        )
+
+        # Output backends: "redis" (default), "shm" (same-host shared memory) or "both"
+        self.output_backend = publisher_config.get('backend', 'redis')
+        self.publish_redis = self.output_backend in ('redis', 'both')
+        self.shm_writer = None
+        self.shm_keep = publisher_config.get('shm_keep', False)
+        if self.output_backend in ('shm', 'both'):
+            self.shm_writer = ShmCommandWriter(publisher_config.get('shm_name', SHM_NAME))
+            print(f"Publishing to shared memory block '{self.shm_writer.name}'")
+
+        # Connect to Redis (in the background; publishing resumes whenever the link is up)
+        self.redis_link = RedisLink(
+            host=redis_config.get('host', 'localhost'),
+            port=redis_config.get('port', 6379),
+            db=redis_config.get('db', 0),
+            unix_socket_path=redis_config.get('unix_socket_path'),
+            # Default: two control periods, so a stuck write costs at most one missed tick
+            socket_timeout=redis_config.get('socket_timeout') or 2.0 / self.publish_rate,
+            connect_timeout=redis_config.get('connect_timeout', 0.5),
+            max_connections=redis_config.get('max_connections', 4),
+            backoff_initial=redis_config.get('reconnect_backoff_initial', 0.1),
+            backoff_max=redis_config.get('reconnect_backoff_max', 5.0)
+        )
+        self.redis_link.start()
+        self.redis_output = FrameOutput(
+            MIMIC_OBS_KEY,
+            modes=redis_config.get('outputs', ['set']),
+            stream_key=redis_config.get('stream_key'),
+            stream_maxlen=redis_config.get('stream_maxlen', 1000),
+            channel=redis_config.get('channel'),
+            meta_key=frame_metadata_key(MIMIC_OBS_KEY) if self.frame_metadata == 'key' else None
+        )
+        self.frame_seq = 0  # Sequence number of the last frame written
+
+        # Publish costs and counters, shown live and optionally exported
+        self.telemetry = PublisherTelemetry()
+        self.failures_shown = 0  # Failed frames as of the last status refresh
+        self.metrics_exporter = None
+        telemetry_config = self.config.get('telemetry', {})
+        if telemetry_config.get('export'):
+            try:
+                self.metrics_exporter = MetricsExporter(
+                    self.telemetry_snapshot,
+                    fmt=telemetry_config['export'],
+                    path=telemetry_config.get('path'),
+                    port=telemetry_config.get('port'),
+                    host=telemetry_config.get('host', '127.0.0.1'),
+                    interval=telemetry_config.get('interval', 1.0)
+                )
+                self.metrics_exporter.start()
+                print(f"Exporting publisher telemetry ({telemetry_config['export']})")
+            except (ValueError, OSError) as e:
+                print(f"⚠️  Warning: Telemetry export disabled: {e}")
 
         # Symmetric mode: mirror left joints to right
         self.symmetric_mode = False
 
         # Joint pairs mapping: left_idx -> (right_idx, flip_sign)
-        # flip_sign=True means negate the value (e.g., for roll joints)
-        self.joint_pairs = {
-            # Left leg -> Right leg
-            0: (6, False),   # hip_pitch
-            1: (7, True),    # hip_roll (flip sign)
-            2: (8, True),    # hip_yaw (flip sign)
-            3: (9, False),   # knee
-            4: (10, False),  # ankle_pitch
-            5: (11, True),   # ankle_roll (flip sign)
-            # Left arm -> Right arm
-            15: (22, False),  # shoulder_pitch
-            16: (23, True),   # shoulder_roll (flip sign)
-            17: (24, True),   # shoulder_yaw (flip sign)
-            18: (25, False),  # elbow
-            19: (26, False),  # wrist_roll
-            20: (27, False),  # wrist_pitch
-            21: (28, False),  # wrist_yaw
-        }
+        self.joint_pairs = JOINT_PAIRS
+
+        # Slider input not yet committed (NaN = untouched); flushed once per view frame
+        self.pending_input = np.full(self.num_joints, np.nan)
 
         # Scene Creator state
-        self.scene_steps = []  # List of {pose_name, hold_time, interp_time}
+        # One step list per track: 'full_body' plus optional joint-group tracks
+        self.scene_tracks = {'full_body': []}  # track -> list of {pose_name, hold_time, interp_time}
+        self.scene_track = 'full_body'  # Track shown and edited in the Scene Creator
         self.scene_playing = False
         self.scene_loop = False
-        self.current_scene_step = 0
-        self.pending_interp_time = 0.0  # Interp time for arriving at next pose
 
         # Find saved files relative to this script
         script_dir = Path(__file__).parent
         self.saved_scenes_file = script_dir.parent / "examples" / "saved_scenes.yaml"
         self.saved_poses_file = script_dir.parent / "examples" / "saved_poses.yaml"
-
-        self.interp_callback = None  # Callback when interpolation completes
+        # Pose/scene storage: the YAML files above (default) or an SQLite library
+        self.pose_store, self.scene_store = open_stores(
+            self.config.get('storage', {}), self.saved_poses_file, self.saved_scenes_file, self.joint_names
+        )
+        # Loaded once, reloaded only when the stored poses change
+        self.pose_library = PoseLibrary(self.pose_store, self.num_joints)
+
+        # Widget refresh rate, capped separately from the publish rate
+        gui_config = self.config.get('gui', {})
+        view_fps = gui_config.get('view_fps', 60)
+        if not view_fps or view_fps <= 0:
+            print(f"⚠️  Warning: Invalid gui.view_fps {view_fps!r}, using 60")
+            view_fps = 60
+        self.view_period_ms = max(int(round(1000.0 / view_fps)), 1)
+
+        # Event-loop stall detector (logs handlers that block Tk for too long)
+        self.stall_watchdog = None
+        if gui_config.get('stall_threshold_ms', 100):
+            self.stall_watchdog = TkStallWatchdog(
+                self.root,
+                period_ms=gui_config.get('stall_probe_ms', 50),
+                threshold_ms=gui_config.get('stall_threshold_ms', 100)
+            )
+            self.stall_watchdog.start()
 
         # Build GUI
         self.build_gui()
@@ -158,10 +224,8 @@ class JointControllerGUI:
         control_frame = ttk.LabelFrame(main_frame, text="Control", padding="10")
         control_frame.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=(0, 10))
 
-        # Redis status
-        status_text = "[OK] Redis Connected" if self.redis_connected else "[X] Redis Disconnected"
-        status_color = "green" if self.redis_connected else "red"
-        self.status_label = tk.Label(control_frame, text=status_text, fg=status_color, font=("Arial", 12, "bold"))
+        # Redis status (follows the live connection state, see update_publisher_status)
+        self.status_label = tk.Label(control_frame, text="[..] Redis Connecting", fg="orange", font=("Arial", 12, "bold"))
         self.status_label.grid(row=0, column=0, padx=10)
 
         # Publishing toggle
@@ -188,13 +252,28 @@ class JointControllerGUI:
         zero_btn = ttk.Button(control_frame, text="Zero All", command=self.zero_all)
         zero_btn.grid(row=0, column=4, padx=10)
 
-        # Publish rate display
+        # Publish rate selector
+        rate_frame = ttk.Frame(control_frame)
+        rate_frame.grid(row=0, column=5, padx=10)
+        ttk.Label(rate_frame, text="Rate (Hz):").pack(side=tk.LEFT)
+        self.rate_var = tk.StringVar(value=str(self.publish_rate))
+        self.rate_combo = ttk.Combobox(rate_frame, textvariable=self.rate_var, width=5,
+                                       values=["50", "100", "200"])
+        self.rate_combo.pack(side=tk.LEFT, padx=5)
+        self.rate_combo.bind('<<ComboboxSelected>>', lambda e: self.change_publish_rate())
+        self.rate_combo.bind('<Return>', lambda e: self.change_publish_rate())
+
+        # Measured rate and jitter display
         self.rate_label = tk.Label(control_frame, text=f"Rate: {self.publish_rate} Hz", font=("Arial", 10))
-        self.rate_label.grid(row=0, column=5, padx=10)
+        self.rate_label.grid(row=0, column=6, padx=10)
+
+        # Live publisher telemetry (third row, see update_publisher_status)
+        self.telemetry_label = tk.Label(control_frame, text="", font=("Courier", 9), anchor=tk.W)
+        self.telemetry_label.grid(row=2, column=0, columnspan=7, pady=(5, 0), sticky=(tk.W, tk.E))
 
         # Save/Load pose controls (second row)
         save_frame = ttk.Frame(control_frame)
-        save_frame.grid(row=1, column=0, columnspan=6, pady=(10, 0), sticky=(tk.W, tk.E))
+        save_frame.grid(row=1, column=0, columnspan=7, pady=(10, 0), sticky=(tk.W, tk.E))
 
         ttk.Label(save_frame, text="Pose Name:").grid(row=0, column=0, padx=5)
         self.pose_name_entry = ttk.Entry(save_frame, width=20)
@@ -213,12 +292,19 @@ class JointControllerGUI:
         self.interp_time_entry.grid(row=0, column=5, padx=5)
         self.interp_time_entry.insert(0, "2.0")
 
-        # Interpolation state
-        self.interpolating = False
-        self.interp_start_angles = None
-        self.interp_target_angles = None
-        self.interp_start_time = None
-        self.interp_duration = 2.0
+        # Mirror the current pose onto the other side
+        mirror_l_btn = ttk.Button(save_frame, text="Mirror L→R", command=lambda: self.mirror_pose("left_to_right"))
+        mirror_l_btn.grid(row=0, column=6, padx=5)
+        mirror_r_btn = ttk.Button(save_frame, text="Mirror R→L", command=lambda: self.mirror_pose("right_to_left"))
+        mirror_r_btn.grid(row=0, column=7, padx=5)
+
+        # Interpolation profile for moves and scene transitions
+        ttk.Label(save_frame, text="Profile:").grid(row=0, column=8, padx=5)
+        self.profile_var = tk.StringVar(value=self.motion_engine.profile)
+        profile_combo = ttk.Combobox(save_frame, textvariable=self.profile_var, width=11,
+                                     state="readonly", values=list(PROFILES))
+        profile_combo.grid(row=0, column=9, padx=5)
+        profile_combo.bind('<<ComboboxSelected>>', lambda e: self.change_profile())
 
         # Canvas with scrollbar for sliders
         canvas_frame = ttk.Frame(main_frame)
@@ -268,13 +354,7 @@ class JointControllerGUI:
         self.value_labels = []
 
         # Group joints by body part
-        groups = [
-            ("Left Leg", 0, 6),
-            ("Right Leg", 6, 12),
-            ("Waist", 12, 15),
-            ("Left Arm", 15, 22),
-            ("Right Arm", 22, 29)
-        ]
+        groups = [(self.group_label(name), start, end) for name, (start, end) in JOINT_GROUPS.items()]
 
         row = 0
         for group_name, start_idx, end_idx in groups:
@@ -308,6 +388,13 @@ class JointControllerGUI:
                 value_label.grid(row=i-start_idx, column=2, sticky=tk.W, padx=5, pady=2)
                 self.value_labels.append(value_label)
 
+        # Widgets are refreshed by diffing against what they currently show
+        self.joint_view = JointSliderView(
+            self.sliders, self.value_labels,
+            [lower for lower, _ in self.joint_limits], [upper for _, upper in self.joint_limits],
+            self.format_value, self.default_angles
+        )
+
         # ==================== SCENE CREATOR PANEL (Right Side) ====================
         self.build_scene_creator(main_frame)
 
@@ -322,6 +409,20 @@ class JointControllerGUI:
         steps_label = ttk.Label(scene_frame, text="Scene Steps:", font=("Arial", 10, "bold"))
         steps_label.grid(row=0, column=0, sticky=tk.W, pady=(0, 5))
 
+        # Track selector: full-body steps or a joint group with its own timeline
+        track_frame = ttk.Frame(scene_frame)
+        track_frame.grid(row=1, column=0, sticky=(tk.W, tk.E))
+        ttk.Label(track_frame, text="Track:").pack(side=tk.LEFT, padx=(0, 5))
+        self.scene_track_var = tk.StringVar(value=self.group_label('full_body'))
+        self.scene_track_combo = ttk.Combobox(
+            track_frame, textvariable=self.scene_track_var, width=14, state="readonly",
+            values=[self.group_label(name) for name in self.track_names()]
+        )
+        self.scene_track_combo.pack(side=tk.LEFT)
+        self.scene_track_combo.bind("<<ComboboxSelected>>", lambda event: self.select_scene_track())
+        self.scene_tracks_label = ttk.Label(track_frame, text="", font=("Arial", 9))
+        self.scene_tracks_label.pack(side=tk.LEFT, padx=5)
+
         # Listbox with scrollbar
         listbox_frame = ttk.Frame(scene_frame)
         listbox_frame.grid(row=2, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
@@ -403,10 +504,28 @@ class JointControllerGUI:
         self.stop_btn = ttk.Button(btn_frame, text="Stop", command=self.stop_scene, state=tk.DISABLED)
         self.stop_btn.pack(side=tk.LEFT, padx=5)
 
+        # Playback speed factor (applies immediately, also while playing)
+        ttk.Label(btn_frame, text="Speed:").pack(side=tk.LEFT, padx=(10, 0))
+        self.speed_var = tk.StringVar(value=f"{self.motion_engine.speed:g}")
+        speed_combo = ttk.Combobox(btn_frame, textvariable=self.speed_var, width=5,
+                                   values=["0.25", "0.5", "1", "1.5", "2"])
+        speed_combo.pack(side=tk.LEFT, padx=5)
+        speed_combo.bind('<<ComboboxSelected>>', lambda e: self.change_scene_speed())
+        speed_combo.bind('<Return>', lambda e: self.change_scene_speed())
+
         # Progress label
         self.scene_progress_label = ttk.Label(playback_frame, text="Stopped", font=("Arial", 9))
         self.scene_progress_label.grid(row=2, column=0, columnspan=2, pady=5)
 
+        # Scene position (drag to seek/scrub while playing)
+        self.scene_position_var = tk.DoubleVar(value=0.0)
+        self.scene_position_scale = ttk.Scale(
+            playback_frame, from_=0.0, to=1.0, orient=tk.HORIZONTAL,
+            variable=self.scene_position_var, command=lambda val: self.seek_scene(float(val))
+        )
+        self.scene_position_scale.grid(row=3, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=2)
+        self.scene_position_shown = 0.0  # Last position set programmatically
+
         # === Save/Load Scene ===
         scene_io_frame = ttk.LabelFrame(scene_frame, text="Scene File", padding="5")
         scene_io_frame.grid(row=6, column=0, sticky=(tk.W, tk.E), pady=10)
@@ -422,18 +541,143 @@ class JointControllerGUI:
         ttk.Button(io_btn_frame, text="Save Scene", command=self.save_scene).pack(side=tk.LEFT, padx=5)
         ttk.Button(io_btn_frame, text="Load Scene", command=self.show_load_scene_dialog).pack(side=tk.LEFT, padx=5)
 
+        # === Body-Part Layers ===
+        layer_frame = ttk.LabelFrame(scene_frame, text="Layers", padding="5")
+        layer_frame.grid(row=7, column=0, sticky=(tk.W, tk.E), pady=10)
+
+        ttk.Label(layer_frame, text="Group:").grid(row=0, column=0, padx=5, sticky=tk.W)
+        self.layer_group_var = tk.StringVar(value=self.group_label("arms"))
+        group_combo = ttk.Combobox(
+            layer_frame, textvariable=self.layer_group_var, width=14, state="readonly",
+            values=[self.group_label(name) for name in list(JOINT_GROUPS) + list(GROUP_ALIASES)]
+        )
+        group_combo.grid(row=0, column=1, padx=5, pady=2, sticky=tk.W)
+
+        ttk.Label(layer_frame, text="Source:").grid(row=1, column=0, padx=5, sticky=tk.W)
+        self.layer_source_var = tk.StringVar(value="Current pose")
+        source_combo = ttk.Combobox(
+            layer_frame, textvariable=self.layer_source_var, width=14, state="readonly",
+            values=["Current pose", "Selected pose", "Scene (loop)"]
+        )
+        source_combo.grid(row=1, column=1, padx=5, pady=2, sticky=tk.W)
+
+        ttk.Label(layer_frame, text="Weight:").grid(row=2, column=0, padx=5, sticky=tk.W)
+        self.layer_weight_entry = ttk.Entry(layer_frame, width=10)
+        self.layer_weight_entry.grid(row=2, column=1, padx=5, pady=2, sticky=tk.W)
+        self.layer_weight_entry.insert(0, "1.0")
+
+        layer_btn_frame = ttk.Frame(layer_frame)
+        layer_btn_frame.grid(row=3, column=0, columnspan=2, pady=5)
+        ttk.Button(layer_btn_frame, text="Apply", command=self.apply_layer).pack(side=tk.LEFT, padx=2)
+        ttk.Button(layer_btn_frame, text="Remove", command=self.remove_layer).pack(side=tk.LEFT, padx=2)
+        ttk.Button(layer_btn_frame, text="Clear All", command=lambda: self.remove_layer(all_layers=True)).pack(side=tk.LEFT, padx=2)
+
+        self.layer_status_label = ttk.Label(layer_frame, text="No layers", font=("Arial", 9), wraplength=250)
+        self.layer_status_label.grid(row=4, column=0, columnspan=2, pady=2, sticky=tk.W)
+
+    @staticmethod
+    def group_label(name):
+        """'left_arm' -> 'Left Arm'"""
+        return name.replace('_', ' ').title()
+
+    @staticmethod
+    def track_names():
+        """Full body first, then every joint group and group alias"""
+        return ['full_body'] + list(JOINT_GROUPS) + list(GROUP_ALIASES)
+
+    def group_from_label(self, label):
+        for name in self.track_names():
+            if self.group_label(name) == label:
+                return name
+        return None
+
+    def selected_layer_group(self):
+        return self.group_from_label(self.layer_group_var.get())
+
+    def apply_layer(self):
+        """Drive the selected joint group from the selected source"""
+        group = self.selected_layer_group()
+        if group is None:
+            self.show_message("Error", "Please select a joint group!")
+            return
+        try:
+            weight = float(self.layer_weight_entry.get())
+            if not 0.0 <= weight <= 1.0:
+                raise ValueError
+        except ValueError:
+            self.show_message("Error", "Layer weight must be between 0 and 1!")
+            return
+
+        source = self.layer_source_var.get()
+        if source == "Current pose":
+            self.motion_engine.set_layer(group, group, HeldPose(self.joint_state.angles), weight)
+        elif source == "Selected pose":
+            pose_name = self.scene_pose_var.get()
+            if pose_name not in self.pose_library.index:
+                self.show_message("Error", "Select a saved pose in the Add Step dropdown first!")
+                return
+            self.motion_engine.set_layer(group, group, HeldPose(self.pose_library.angles(pose_name)), weight)
+        else:
+            if not self.scene_steps:
+                self.show_message("Error", "No steps in scene! Add poses first.")
+                return
+            self.pose_library.refresh()
+            missing = [step['pose_name'] for step in self.scene_steps if step['pose_name'] not in self.pose_library.index]
+            if missing:
+                self.show_message("Error", f"Pose '{missing[0]}' not found!")
+                return
+            scene_poses = {step['pose_name']: self.pose_library.angles(step['pose_name']) for step in self.scene_steps}
+            self.motion_engine.layer_scene(group, group, self.scene_steps, scene_poses, loop=True, weight=weight)
+        print(f"Layer '{group}': {source} (weight {weight:g})")
+        self.update_layer_status()
+
+    def remove_layer(self, all_layers=False):
+        """Fade the selected (or every) layer back to the base pose"""
+        self.motion_engine.remove_layer(None if all_layers else self.selected_layer_group())
+        self.update_layer_status()
+
+    def update_layer_status(self):
+        layers = [name for name, _, _, removing in self.motion_engine.describe_layers() if not removing]
+        self.layer_status_label.config(
+            text="Layers: " + ", ".join(self.group_label(name) for name in layers) if layers else "No layers"
+        )
+
     def refresh_pose_combo(self):
         """Refresh the pose dropdown with saved poses"""
-        poses = []
-        if self.saved_poses_file.exists():
-            with open(self.saved_poses_file, 'r') as f:
-                data = yaml.safe_load(f)
-                if data:
-                    poses = list(data.keys())
+        poses = self.pose_library.names()
         self.scene_pose_combo['values'] = poses
         if poses:
             self.scene_pose_combo.current(0)
 
+    @property
+    def scene_steps(self):
+        """Steps of the track being edited"""
+        return self.scene_tracks.setdefault(self.scene_track, [])
+
+    @scene_steps.setter
+    def scene_steps(self, steps):
+        self.scene_tracks[self.scene_track] = steps
+
+    def select_scene_track(self):
+        """Show and edit the track picked in the track selector"""
+        self.scene_track = self.group_from_label(self.scene_track_var.get()) or 'full_body'
+        self.update_scene_listbox()
+
+    @staticmethod
+    def parse_interp_time(text):
+        """Seconds (>= 0) or "auto"; raises ValueError otherwise"""
+        text = text.strip().lower()
+        if text == "auto":
+            return "auto"
+        value = float(text)
+        if value < 0:
+            raise ValueError("Negative interpolation time")
+        return value
+
+    @staticmethod
+    def format_interp_time(interp_time):
+        return "auto" if interp_time == "auto" else f"{interp_time:.1f}s"
+
     def add_scene_step(self):
         """Add a step to the scene"""
         pose_name = self.scene_pose_var.get()
@@ -450,9 +694,7 @@ class JointControllerGUI:
             return
 
         try:
-            interp_time = float(self.scene_interp_entry.get())
-            if interp_time < 0:
-                raise ValueError("interp")
+            interp_time = self.parse_interp_time(self.scene_interp_entry.get())
         except ValueError:
             self.show_message("Error", "Invalid interpolation time!")
             return
@@ -528,8 +770,8 @@ class JointControllerGUI:
         def save_changes():
             try:
                 new_hold = float(hold_entry.get())
-                new_interp = float(interp_entry.get())
-                if new_hold < 0 or new_interp < 0:
+                new_interp = self.parse_interp_time(interp_entry.get())
+                if new_hold < 0:
                     raise ValueError("Negative values not allowed")
             except ValueError:
                 self.show_message("Error", "Invalid time values!")
@@ -603,6 +845,11 @@ class JointControllerGUI:
 
     def update_scene_listbox(self):
         """Update the scene listbox display - multi-line per step"""
+        # Other tracks that have steps
+        others = [self.group_label(name) for name, steps in self.scene_tracks.items()
+                  if steps and name != self.scene_track]
+        self.scene_tracks_label.config(text=f"(also: {', '.join(others)})" if others else "")
+
         self.scene_listbox.delete(0, tk.END)
         for i, step in enumerate(self.scene_steps):
             # Get values with backwards compatibility
@@ -614,125 +861,101 @@ class JointControllerGUI:
             # Line 2: Hold time
             self.scene_listbox.insert(tk.END, f"     Hold:   {hold_time:.1f}s")
             # Line 3: Interp time (to next pose)
-            self.scene_listbox.insert(tk.END, f"     Interp: {interp_time:.1f}s")
+            self.scene_listbox.insert(tk.END, f"     Interp: {self.format_interp_time(interp_time)}")
             # Separator line
             self.scene_listbox.insert(tk.END, "   ----------------")
 
+    def change_scene_speed(self):
+        """Apply the playback speed factor selected in the playback controls"""
+        try:
+            speed = float(self.speed_var.get())
+            if speed <= 0 or speed > 10:
+                raise ValueError
+        except ValueError:
+            self.show_message("Error", "Invalid playback speed!")
+            self.speed_var.set(f"{self.motion_engine.speed:g}")
+            return
+        self.motion_engine.set_speed(speed)
+        print(f"Scene playback speed: {speed:g}x")
+
+    def change_profile(self):
+        """Apply the interpolation profile selected in the control bar"""
+        self.motion_engine.set_profile(self.profile_var.get())
+        print(f"Interpolation profile: {self.profile_var.get()}")
+
     def toggle_loop(self):
         """Toggle loop mode"""
         self.scene_loop = self.loop_var.get()
+        self.motion_engine.set_loop(self.scene_loop)
 
     def play_scene(self):
         """Start playing the scene"""
-        if not self.scene_steps:
+        all_steps = [step for steps in self.scene_tracks.values() for step in steps]
+        if not all_steps:
             self.show_message("Error", "No steps in scene! Add poses first.")
             return
 
         # Verify all poses exist
-        if not self.saved_poses_file.exists():
-            self.show_message("Error", "No saved poses file found!")
+        if not len(self.pose_library):
+            self.show_message("Error", "No saved poses found!")
             return
 
-        with open(self.saved_poses_file, 'r') as f:
-            poses = yaml.safe_load(f) or {}
-
-        for step in self.scene_steps:
-            if step['pose_name'] not in poses:
+        self.pose_library.refresh()
+        for step in all_steps:
+            if step['pose_name'] not in self.pose_library.index:
                 self.show_message("Error", f"Pose '{step['pose_name']}' not found!")
                 return
 
-        # Start playback
+        # Start playback (sequencing runs in the motion engine)
         self.scene_playing = True
-        self.current_scene_step = 0
-        self.pending_interp_time = 3.0  # First pose: 3 second transition
         self.play_btn.config(state=tk.DISABLED)
         self.stop_btn.config(state=tk.NORMAL)
 
-        print(f"Playing scene with {len(self.scene_steps)} steps (loop={self.scene_loop})")
-        self.play_scene_step_interpolate()
-
-    def play_scene_step_interpolate(self):
-        """Phase 1: Interpolate to the current pose"""
-        if not self.scene_playing:
+        tracks = {name: steps for name, steps in self.scene_tracks.items() if name != 'full_body' and steps}
+        print(f"Playing scene with {len(all_steps)} steps in {len(tracks) + bool(self.scene_tracks['full_body'])} "
+              f"track(s) (loop={self.scene_loop})")
+        scene_poses = {step['pose_name']: self.pose_library.angles(step['pose_name']) for step in all_steps}
+        # First pose: 3 second transition
+        self.motion_engine.play_scene(self.scene_tracks['full_body'], scene_poses, loop=self.scene_loop,
+                                      first_interp_time=3.0, tracks=tracks)
+
+    def on_scene_step(self, step_idx, phase, step, track):
+        """Show scene progress reported by the motion engine"""
+        # Follow the track being edited (any track if that one is empty)
+        if track != self.scene_track and self.scene_steps:
             return
 
-        if self.current_scene_step >= len(self.scene_steps):
-            if self.scene_loop:
-                self.current_scene_step = 0
-                # Use last step's interp_time for loop back
-                self.pending_interp_time = self.scene_steps[-1].get('interp_time', 1.0)
-                print("Looping scene...")
-            else:
-                self.stop_scene()
-                print("Scene playback complete!")
-                return
-
-        step = self.scene_steps[self.current_scene_step]
-        hold_time = step.get('hold_time', 0.0)
-
+        if phase == 'moving':
+            status = "moving"
+        else:
+            status = f"holding {step.get('hold_time', 0.0):.1f}s"
+        prefix = "" if track == 'full_body' else f"{self.group_label(track)} "
         self.scene_progress_label.config(
-            text=f"Step {self.current_scene_step + 1}/{len(self.scene_steps)}: {step['pose_name']} (moving)"
+            text=f"{prefix}Step {step_idx + 1}/{len(self.scene_tracks[track])}: {step['pose_name']} ({status})"
         )
 
         # Highlight current step in listbox (first line of the step)
-        listbox_idx = self.step_to_listbox_index(self.current_scene_step)
-        self.scene_listbox.selection_clear(0, tk.END)
-        self.scene_listbox.selection_set(listbox_idx)
-        self.scene_listbox.see(listbox_idx)
-
-        # Load pose data
-        with open(self.saved_poses_file, 'r') as f:
-            poses = yaml.safe_load(f)
-
-        pose_data = poses[step['pose_name']]
-        target_angles = np.array(pose_data['angles'])
-
-        # Set callback for when interpolation completes -> go to hold phase
-        self.interp_callback = self.play_scene_step_hold
-
-        # Use pending interp time (from previous step or 0 for first)
-        self.interp_time_entry.delete(0, tk.END)
-        self.interp_time_entry.insert(0, str(self.pending_interp_time))
-
-        # Start interpolation to this pose
-        self.interpolate_to_pose(target_angles, step['pose_name'])
-
-    def play_scene_step_hold(self):
-        """Phase 2: Hold at the current pose for hold_time"""
-        if not self.scene_playing:
+        if track == self.scene_track and phase == 'moving' and step_idx < len(self.scene_steps):
+            listbox_idx = self.step_to_listbox_index(step_idx)
+            self.scene_listbox.selection_clear(0, tk.END)
+            self.scene_listbox.selection_set(listbox_idx)
+            self.scene_listbox.see(listbox_idx)
+
+    def seek_scene(self, position):
+        """Seek the playing scene to position (seconds) from the position slider"""
+        # Ignore the slider echoing a position set by refresh_view
+        if not self.scene_playing or abs(position - self.scene_position_shown) < 1e-6:
             return
-
-        step = self.scene_steps[self.current_scene_step]
-        hold_time = step.get('hold_time', 0.0)
-        interp_time = step.get('interp_time', 1.0)
-
-        self.scene_progress_label.config(
-            text=f"Step {self.current_scene_step + 1}/{len(self.scene_steps)}: {step['pose_name']} (holding {hold_time:.1f}s)"
-        )
-
-        # Store this step's interp_time for the NEXT step's arrival
-        self.pending_interp_time = interp_time
-
-        # Move to next step index
-        self.current_scene_step += 1
-
-        # Wait for hold_time, then go to next step
-        hold_ms = int(hold_time * 1000)
-        if hold_ms > 0:
-            self.root.after(hold_ms, self.play_scene_step_interpolate)
-        else:
-            # No hold, go immediately to next step
-            self.root.after(50, self.play_scene_step_interpolate)
-
-    def on_scene_step_complete(self):
-        """Legacy callback - redirects to hold phase"""
-        self.play_scene_step_hold()
+        self.motion_engine.seek_scene(position)
 
     def stop_scene(self):
         """Stop scene playback"""
+        self.motion_engine.stop_scene()
+        self.on_scene_stopped()
+
+    def on_scene_stopped(self):
+        """Reset playback controls once the scene is no longer running"""
         self.scene_playing = False
-        self.interp_callback = None
-        self.pending_interp_time = 0.0
         self.play_btn.config(state=tk.NORMAL)
         self.stop_btn.config(state=tk.DISABLED)
         self.scene_progress_label.config(text="Stopped")
@@ -746,39 +969,28 @@ class JointControllerGUI:
             self.show_message("Error", "Please enter a scene name!")
             return
 
-        if not self.scene_steps:
+        step_count = sum(len(steps) for steps in self.scene_tracks.values())
+        if not step_count:
             self.show_message("Error", "No steps in scene to save!")
             return
 
-        # Load existing scenes or create new dict
-        if self.saved_scenes_file.exists():
-            with open(self.saved_scenes_file, 'r') as f:
-                scenes = yaml.safe_load(f) or {}
-        else:
-            scenes = {}
-
-        # Save scene
-        scenes[scene_name] = {
-            'steps': self.scene_steps.copy(),
-            'timestamp': time.strftime("%Y-%m-%d %H:%M:%S"),
-            'loop': self.loop_var.get()
-        }
+        # Full-body steps stay under 'steps'; group tracks are only written if used
+        scene = {'steps': list(self.scene_tracks['full_body'])}
+        tracks = {name: list(steps) for name, steps in self.scene_tracks.items() if name != 'full_body' and steps}
+        if tracks:
+            scene['tracks'] = tracks
+        scene['timestamp'] = time.strftime("%Y-%m-%d %H:%M:%S")
+        scene['loop'] = self.loop_var.get()
 
-        with open(self.saved_scenes_file, 'w') as f:
-            yaml.dump(scenes, f, default_flow_style=False, sort_keys=False)
+        # Save scene (only this entry is written with the SQLite backend)
+        self.scene_store.upsert(scene_name, scene)
 
         self.show_message("Success", f"✅ Scene '{scene_name}' saved!")
-        print(f"✅ Saved scene '{scene_name}' with {len(self.scene_steps)} steps")
+        print(f"✅ Saved scene '{scene_name}' with {step_count} steps in {len(tracks) + bool(scene['steps'])} track(s)")
 
     def show_load_scene_dialog(self):
         """Show dialog to load a saved scene"""
-        if not self.saved_scenes_file.exists():
-            self.show_message("Info", "No saved scenes found. Save a scene first!")
-            return
-
-        with open(self.saved_scenes_file, 'r') as f:
-            scenes = yaml.safe_load(f)
-
+        scenes = self.scene_store.load_all()
         if not scenes:
             self.show_message("Info", "No saved scenes found.")
             return
@@ -803,9 +1015,11 @@ class JointControllerGUI:
 
         scene_names = list(scenes.keys())
         for name in scene_names:
-            num_steps = len(scenes[name].get('steps', []))
+            tracks = scenes[name].get('tracks') or {}
+            num_steps = len(scenes[name].get('steps', [])) + sum(len(steps) for steps in tracks.values())
             timestamp = scenes[name].get('timestamp', 'N/A')
-            listbox.insert(tk.END, f"{name} ({num_steps} steps) - {timestamp}")
+            track_info = f", {len(tracks)} group track(s)" if tracks else ""
+            listbox.insert(tk.END, f"{name} ({num_steps} steps{track_info}) - {timestamp}")
 
         # Buttons
         btn_frame = ttk.Frame(dialog)
@@ -819,12 +1033,20 @@ class JointControllerGUI:
 
             name = scene_names[selection[0]]
             scene_data = scenes[name]
-            self.scene_steps = scene_data.get('steps', []).copy()
+            self.scene_tracks = {'full_body': list(scene_data.get('steps') or [])}
+            for track, steps in (scene_data.get('tracks') or {}).items():
+                if track in self.track_names():
+                    self.scene_tracks[track] = list(steps)
+                else:
+                    print(f"⚠️  Warning: Skipping track with unknown joint group '{track}'")
+            self.scene_track = 'full_body'
+            self.scene_track_var.set(self.group_label('full_body'))
             self.loop_var.set(scene_data.get('loop', False))
             self.scene_loop = self.loop_var.get()
             self.update_scene_listbox()
             dialog.destroy()
-            print(f"📂 Loaded scene '{name}' with {len(self.scene_steps)} steps")
+            print(f"📂 Loaded scene '{name}' with {sum(len(steps) for steps in self.scene_tracks.values())} steps "
+                  f"in {sum(1 for steps in self.scene_tracks.values() if steps)} track(s)")
 
         def delete_selected():
             selection = listbox.curselection()
@@ -833,9 +1055,7 @@ class JointControllerGUI:
 
             name = scene_names[selection[0]]
             if self.confirm_dialog(f"Delete scene '{name}'?"):
-                del scenes[name]
-                with open(self.saved_scenes_file, 'w') as f:
-                    yaml.dump(scenes, f, default_flow_style=False, sort_keys=False)
+                self.scene_store.delete(name, scenes)
                 dialog.destroy()
 
         ttk.Button(btn_frame, text="Load", command=load_selected).pack(side=tk.LEFT, padx=5)
@@ -848,18 +1068,35 @@ class JointControllerGUI:
 
     def update_joint(self, joint_idx, value):
         """Update joint value from slider"""
-        self.current_angles[joint_idx] = value
-        self.value_labels[joint_idx].config(text=self.format_value(value))
+        # Tk fires the slider command (later, at idle) for programmatic set() too;
+        # ignore those echoes so a stale view value never overrides the engine
+        if self.joint_view.is_echo(joint_idx, value):
+            return
+        self.joint_view.accept(joint_idx, value)
 
-        # Mirror to right side if symmetric mode is enabled and this is a left joint
-        if self.symmetric_mode and joint_idx in self.joint_pairs:
-            right_idx, flip_sign = self.joint_pairs[joint_idx]
-            mirrored_value = -value if flip_sign else value
+        # A drag fires this for every pixel; only the latest value per joint is
+        # kept and committed by flush_input() on the next view frame
+        self.pending_input[joint_idx] = value
 
-            # Update right slider (without triggering another update)
-            self.sliders[right_idx].set(mirrored_value)
-            self.current_angles[right_idx] = mirrored_value
-            self.value_labels[right_idx].config(text=self.format_value(mirrored_value))
+    def flush_input(self):
+        """Commit the slider input gathered since the last frame as one state update"""
+        pending = self.pending_input
+        touched = ~np.isnan(pending)
+        if not touched.any():
+            return
+
+        # Mirror moved left joints to the right side (the view then redraws
+        # the right sliders; their callbacks are ignored as echoes)
+        if self.symmetric_mode:
+            moved = touched[pose_math.LEFT_JOINTS]
+            right = pose_math.RIGHT_JOINTS[moved]
+            pending[right] = pending[pose_math.LEFT_JOINTS[moved]] * pose_math.PAIR_SIGN[moved]
+            touched[right] = True
+
+        indices = np.flatnonzero(touched)
+        # Ignored by the engine while a motion or scene drives the joints
+        self.motion_engine.set_joints(indices, pending[indices])
+        pending.fill(np.nan)
 
     def reset_to_default(self):
         """Reset all joints to default angles with interpolation"""
@@ -872,43 +1109,29 @@ class JointControllerGUI:
 
     def interpolate_to_pose(self, target_angles, pose_name="Target Pose"):
         """Generic method to interpolate to any target pose"""
-        # Get interpolation time from entry field
+        # Get interpolation time from entry field ("auto" = as fast as the joint limits allow)
         try:
-            interp_time = float(self.interp_time_entry.get())
-            if interp_time < 0:
-                raise ValueError
+            interp_time = self.parse_interp_time(self.interp_time_entry.get())
         except ValueError:
             print("Invalid interpolation time! Using 2.0s")
             interp_time = 2.0
 
-        target = np.array(target_angles)
-
-        # Handle instant transition (interp_time == 0)
-        if interp_time <= 0.001:
-            # Set pose immediately without interpolation
-            for i, angle in enumerate(target):
-                self.sliders[i].set(angle)
-                self.current_angles[i] = angle
-                self.value_labels[i].config(text=self.format_value(angle))
-            print(f"Instant move to '{pose_name}'")
-            # Call callback if set (used by scene playback)
-            if self.interp_callback:
-                callback = self.interp_callback
-                self.interp_callback = None
-                self.root.after(10, callback)  # Small delay to allow UI update
-            return
-
-        # Start interpolation
-        self.interp_start_angles = self.current_angles.copy()
-        self.interp_target_angles = target
-        self.interp_duration = interp_time
-        self.interp_start_time = time.time()
-        self.interpolating = True
+        # Never command angles outside the joint limits (saved poses are not checked on save)
+        target = np.asarray(target_angles, dtype=np.float64)
+        outside = pose_math.out_of_limits(target)
+        if outside.any():
+            names = ", ".join(self.joint_names[i] for i in np.flatnonzero(outside))
+            print(f"⚠️  Warning: '{pose_name}' exceeds joint limits ({names}), clamping")
+            target = pose_math.clamp(target)
 
-        print(f"Interpolating to '{pose_name}' over {interp_time:.1f}s...")
+        # The motion engine interpolates on the publisher's clock (0 = instant move)
+        self.motion_engine.move_to(target, interp_time, pose_name)
 
-        # Start interpolation loop
-        self.interpolation_step()
+    def mirror_pose(self, direction):
+        """Copy one side of the current pose onto the other"""
+        mirrored = pose_math.mirror(self.joint_state.angles, direction)
+        label = "L→R" if direction == "left_to_right" else "R→L"
+        self.interpolate_to_pose(mirrored, f"Mirrored Pose ({label})")
 
     def toggle_publishing(self):
         """Toggle publishing on/off"""
@@ -923,38 +1146,161 @@ class JointControllerGUI:
             print("⚖️  Symmetric mode DISABLED")
 
     def publish_to_redis(self):
-        """Publish current joint angles to Redis"""
-        if not self.redis_connected or not self.publishing:
+        """Publish current joint angles to Redis (and/or shared memory)"""
+        if not self.publishing:
+            return
+        if not self.redis_link.connected and self.shm_writer is None:
             return
 
         try:
-            # Build mimic_obs format: root_vel_xy(2) + root_pos_z(1) + roll_pitch(2) + yaw_ang_vel(1) + dof_pos(29)
-            mimic_obs = np.zeros(35)  # 6 + 29
-            mimic_obs[0:2] = [0.0, 0.0]      # root_vel_xy
-            mimic_obs[2] = 0.75              # root_pos_z (standing height)
-            mimic_obs[3:5] = [0.0, 0.0]      # roll, pitch
-            mimic_obs[5] = 0.0               # yaw_ang_vel
-            mimic_obs[6:35] = self.current_angles  # dof_pos
+            # Latest complete joint vector committed by the GUI
+            _, angles = self.joint_state.snapshot()
 
-            # Publish to Redis
-            self.redis_client.set("action_body_unitree_g1_with_hands", json.dumps(mimic_obs.tolist()))
+            # Skip unchanged frames between heartbeats (when suppression is enabled)
+            now = time.monotonic()
+            if not self.change_suppressor.should_publish(angles, now):
+                return
+
+            # mimic_obs format: root_vel_xy(2) + root_pos_z(1) + roll_pitch(2) + yaw_ang_vel(1) + dof_pos(29)
+            # Root fields are constant and live in the encoder's buffer; only dof_pos is copied
+            started = time.perf_counter()
+            self.obs_encoder.update(angles)
+            # Failed writes still use up their number, so consumers see the gap
+            seq = self.frame_seq = self.frame_seq + 1
+            if self.obs_encoder.stamped:
+                self.obs_encoder.stamp(seq, now)
+            payload = self.obs_encoder.payload() if self.publish_redis else None
+            serialize_time = time.perf_counter() - started
+            rtt = None
+            sent = False
+
+            # Same-host consumers read the shared memory block directly
+            if self.shm_writer is not None:
+                self.shm_writer.write(self.obs_encoder.obs, now)
+                sent = True
+
+            # Publish to Redis (a failed write flags the link down and triggers a reconnect)
+            if self.publish_redis and self.redis_link.connected:
+                started = time.perf_counter()
+                sent = self.redis_link.write_frame(self.redis_output, payload, seq, now) or sent
+                rtt = time.perf_counter() - started
+
+            self.telemetry.record(serialize_time, rtt)
+            if sent:
+                self.change_suppressor.mark_sent(angles, now)
+            else:
+                self.telemetry.frames_failed += 1
 
         except Exception as e:
-            print(f"Error publishing to Redis: {e}")
+            self.telemetry.publish_errors += 1
+            print(f"Error publishing command: {e}")
 
     def publishing_loop(self):
         """Background thread for publishing"""
-        dt = 1.0 / self.publish_rate
-        while True:
+        while not self.publisher_stop.is_set():
+            # Sleep until the next absolute deadline (publish cost does not stretch the period)
+            self.scheduler.wait()
+            # Motion advances on this clock, independent of Tk frame timing
+            self.motion_engine.tick()
             if self.publishing:
                 self.publish_to_redis()
-            time.sleep(dt)
 
     def start_publishing(self):
         """Start background publishing thread"""
         self.publishing = self.publish_var.get()
-        thread = threading.Thread(target=self.publishing_loop, daemon=True)
-        thread.start()
+        target = self.publishing_loop
+        if self.profiler is not None:
+            target = self.profiler.wrap_thread("publisher", target)
+        self.publisher_stop = threading.Event()
+        self.publisher_thread = threading.Thread(target=target, daemon=True)
+        self.publisher_thread.start()
+        self.update_publisher_status()
+        self.view_version = None
+        self.refresh_view()
+
+    def shutdown(self):
+        """Stop the publishing thread, then the Redis link, the telemetry export and the shared memory block"""
+        self.publisher_stop.set()
+        self.publisher_thread.join(timeout=1.0)
+        self.redis_link.stop()
+        if self.metrics_exporter is not None:
+            # The periodic export would miss everything since its last interval
+            try:
+                self.metrics_exporter.export_once()
+            except Exception as e:
+                print(f"⚠️  Warning: Final telemetry export failed: {e}")
+            self.metrics_exporter.stop()
+            self.metrics_exporter = None
+        if self.shm_writer is not None and not self.publisher_thread.is_alive():
+            # Readers see the writer stop; a kept block is taken over by the next run
+            self.shm_writer.close(unlink=not self.shm_keep)
+            self.shm_writer = None
+
+    def change_publish_rate(self):
+        """Apply the publish rate selected in the control bar"""
+        try:
+            rate = float(self.rate_var.get())
+            if rate <= 0 or rate > 1000:
+                raise ValueError
+        except ValueError:
+            self.show_message("Error", "Invalid publish rate!")
+            self.rate_var.set(str(self.publish_rate))
+            return
+
+        self.publish_rate = rate
+        self.scheduler.set_rate(rate)
+        print(f"Publish rate set to {rate:g} Hz")
+
+    def update_publisher_status(self):
+        """Refresh the Redis status and the measured rate and jitter display"""
+        if self.redis_link.connected:
+            self.status_label.config(text="[OK] Redis Connected", fg="green")
+        elif self.redis_link.ever_connected:
+            self.status_label.config(text="[..] Redis Reconnecting", fg="orange")
+        elif self.redis_link.last_error is None:
+            self.status_label.config(text="[..] Redis Connecting", fg="orange")
+        else:
+            self.status_label.config(text="[X] Redis Disconnected", fg="red")
+
+        metrics = self.telemetry_snapshot()
+        text = (f"Rate: {metrics['measured_rate_hz']:.1f}/{metrics['target_rate_hz']:g} Hz  "
+                f"Jitter: {metrics['tick_jitter_ms']:.2f} ms")
+        if self.change_suppressor.enabled:
+            text += (f"  Sent: {metrics['frames_sent_total']}"
+                     f"  Suppressed: {metrics['frames_suppressed_total']}")
+        self.rate_label.config(text=text)
+
+        self.telemetry_label.config(
+            text=(f"Late p50/p90/p99: {metrics['tick_lateness_p50_ms']:.2f}/{metrics['tick_lateness_p90_ms']:.2f}/"
+                  f"{metrics['tick_lateness_p99_ms']:.2f} ms  "
+                  f"Encode: {metrics['serialize_p50_us']:.0f} us  "
+                  f"Redis RTT p50/p99: {metrics['redis_rtt_p50_ms']:.2f}/{metrics['redis_rtt_p99_ms']:.2f} ms  "
+                  f"Errors: {metrics['redis_errors_total'] + metrics['publish_errors_total']}  "
+                  f"Reconnects: {metrics['redis_reconnects_total']}  "
+                  f"Skipped: {metrics['skipped_ticks_total']}  "
+                  f"Failed: {metrics['frames_failed_total']}  "
+                  f"Suppressed: {metrics['frames_suppressed_total']}"),
+            fg=self.telemetry_color(metrics)
+        )
+        self.root.after(500, self.update_publisher_status)
+
+    def telemetry_snapshot(self):
+        """Current publisher metrics (safe to call from any thread)"""
+        return self.telemetry.snapshot(self.scheduler, self.redis_link, self.change_suppressor)
+
+    def telemetry_color(self, metrics):
+        """Red when frames are failing, orange when the stream is degraded, black otherwise"""
+        failed = metrics['frames_failed_total'] + metrics['publish_errors_total']
+        newly_failed = failed - self.failures_shown
+        self.failures_shown = failed
+        if newly_failed > 0 or (self.publish_redis and not metrics['redis_connected']):
+            return "red"
+        if self.publishing and metrics['ticks_total'] > metrics['target_rate_hz']:
+            period_ms = 1000.0 / metrics['target_rate_hz']
+            if (metrics['measured_rate_hz'] < 0.95 * metrics['target_rate_hz']
+                    or metrics['tick_lateness_p99_ms'] > 0.5 * period_ms):
+                return "orange"
+        return "black"
 
     def save_pose(self):
         """Save current joint configuration to file"""
@@ -963,40 +1309,25 @@ class JointControllerGUI:
             self.show_message("Error", "Please enter a pose name!")
             return
 
-        # Load existing poses or create new dict
-        if self.saved_poses_file.exists():
-            with open(self.saved_poses_file, 'r') as f:
-                poses = yaml.safe_load(f) or {}
-        else:
-            poses = {}
-
         # Save current angles with metadata
-        poses[pose_name] = {
-            'angles': self.current_angles.tolist(),
+        self.pose_library.save(pose_name, {
+            'angles': self.joint_state.angles.tolist(),
             'joint_names': self.joint_names,
             'timestamp': time.strftime("%Y-%m-%d %H:%M:%S"),
             'description': f"Custom pose: {pose_name}"
-        }
-
-        # Write to file
-        with open(self.saved_poses_file, 'w') as f:
-            yaml.dump(poses, f, default_flow_style=False, sort_keys=False)
+        })
 
-        self.show_message("Success", f"✅ Pose '{pose_name}' saved to {self.saved_poses_file}")
-        print(f"✅ Saved pose '{pose_name}' with {len(self.current_angles)} joint angles")
+        self.show_message("Success", f"✅ Pose '{pose_name}' saved")
+        print(f"✅ Saved pose '{pose_name}' with {len(self.joint_state.angles)} joint angles")
 
     def show_load_dialog(self):
         """Show dialog to select and load a saved pose"""
-        if not self.saved_poses_file.exists():
-            self.show_message("Info", "No saved poses found. Save a pose first!")
-            return
-
-        # Load poses
-        with open(self.saved_poses_file, 'r') as f:
-            poses = yaml.safe_load(f)
+        # Load poses (cached; only reloaded if the store changed)
+        self.pose_library.refresh()
+        poses = self.pose_library.entries
 
         if not poses:
-            self.show_message("Info", "No saved poses found.")
+            self.show_message("Info", "No saved poses found. Save a pose first!")
             return
 
         # Create selection dialog
@@ -1063,9 +1394,7 @@ class JointControllerGUI:
             name = pose_names[idx]
 
             if self.confirm_dialog(f"Delete pose '{name}'?"):
-                del poses[name]
-                with open(self.saved_poses_file, 'w') as f:
-                    yaml.dump(poses, f, default_flow_style=False, sort_keys=False)
+                self.pose_library.delete(name)
                 dialog.destroy()
                 self.show_message("Success", f"Deleted pose '{name}'")
 
@@ -1084,43 +1413,45 @@ class JointControllerGUI:
         # Use generic interpolation method
         self.interpolate_to_pose(angles, f"Saved Pose '{pose_name}'")
 
-    def interpolation_step(self):
-        """Perform one step of pose interpolation"""
-        if not self.interpolating:
-            return
-
-        # Safety check: avoid division by zero
-        if self.interp_duration <= 0.001:
-            progress = 1.0
-        else:
-            # Calculate interpolation progress (0.0 to 1.0)
-            elapsed = time.time() - self.interp_start_time
-            progress = min(elapsed / self.interp_duration, 1.0)
-
-        # Linear interpolation (lerp)
-        interpolated_angles = (
-            self.interp_start_angles * (1.0 - progress) +
-            self.interp_target_angles * progress
-        )
+    def refresh_view(self):
+        """Mirror the engine's committed joint vector and events into the widgets"""
+        self.flush_input()
+
+        version, angles = self.joint_state.snapshot()
+        if version != self.view_version:
+            self.view_version = version
+            # Touch only the sliders and labels whose displayed value changed
+            self.joint_view.render(angles)
+
+        # Scene position slider follows playback
+        position = self.motion_engine.scene_position()
+        if position is not None:
+            elapsed, duration = position
+            self.scene_position_scale.config(to=max(duration, 0.001))
+            self.scene_position_shown = elapsed
+            self.scene_position_var.set(elapsed)
+
+        # Engine notifications (posted from the publishing thread)
+        while True:
+            try:
+                event = self.motion_engine.events.get_nowait()
+            except queue.Empty:
+                break
+            kind = event[0]
+            if kind == 'move_complete':
+                print(f"✅ Interpolation complete!")
+            elif kind == 'scene_step':
+                self.on_scene_step(*event[1:])
+            elif kind == 'scene_looped':
+                print("Looping scene...")
+            elif kind == 'scene_finished':
+                self.on_scene_stopped()
+                print("Scene playback complete!")
+            elif kind == 'scene_stopped' and self.scene_playing:
+                self.on_scene_stopped()
 
-        # Update sliders and values
-        for i, angle in enumerate(interpolated_angles):
-            self.sliders[i].set(angle)
-            self.current_angles[i] = angle
-            self.value_labels[i].config(text=self.format_value(angle))
-
-        # Check if interpolation is complete
-        if progress >= 1.0:
-            self.interpolating = False
-            print(f"✅ Interpolation complete!")
-            # Call callback if set (used by scene playback)
-            if self.interp_callback:
-                callback = self.interp_callback
-                self.interp_callback = None  # Clear to avoid repeated calls
-                callback()
-        else:
-            # Schedule next frame (~60 FPS = 16ms)
-            self.root.after(16, self.interpolation_step)
+        # Schedule next frame (view rate is independent of the publish rate)
+        self.root.after(self.view_period_ms, self.refresh_view)
 
     def show_message(self, title, message):
         """Show a message dialog"""
@@ -1165,9 +1496,28 @@ class JointControllerGUI:
 
 
 def main():
+    parser = argparse.ArgumentParser(description="TWIST2 G1 joint controller GUI")
+    parser.add_argument("--config", default=None, help="Robot/controller config (default: config/g1.yaml)")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+
+    # Profiling starts before the GUI so startup (config, pose library, widgets) is included
+    profiler = profiling.session_from_args(args)
+    if profiler is not None:
+        profiler.start()
+        profiler.profile_current("tk")
+
     root = tk.Tk()
-    app = JointControllerGUI(root)
-    root.mainloop()
+    app = JointControllerGUI(root, args.config, profiler)
+    try:
+        root.mainloop()
+    finally:
+        app.shutdown()
+        if profiler is not None:
+            profiler.dump()
+            profiler.stop()
+    if app.stall_watchdog is not None and app.stall_watchdog.probes:
+        print(app.stall_watchdog.report())
 
 
 if __name__ == "__main__":
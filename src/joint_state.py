@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Joint state shared between the Tk thread and the publishing thread
+Writers commit whole joint vectors; readers always see one complete, versioned snapshot
+"""
+import threading
+
+import numpy as np
+
+
+class JointStateStore:
+    """Versioned, immutable snapshots of the commanded joint vector
+
+    commit() builds a new read-only array and swaps it in with a single reference
+    assignment, so snapshot() never needs a lock and never returns a vector that
+    mixes joints from two different commits. Writers are serialized by a lock.
+    """
+
+    def __init__(self, initial_angles):
+        self._write_lock = threading.Lock()
+        self._snapshot = (0, self._freeze(initial_angles))
+
+    @staticmethod
+    def _freeze(angles):
+        frozen = np.array(angles, dtype=np.float64)
+        frozen.flags.writeable = False
+        return frozen
+
+    def commit(self, angles):
+        """Publish a complete joint vector; returns its version"""
+        frozen = self._freeze(angles)
+        with self._write_lock:
+            version = self._snapshot[0] + 1
+            self._snapshot = (version, frozen)
+        return version
+
+    def update(self, indices, values):
+        """Commit a copy of the latest vector with some joints replaced; returns its version"""
+        with self._write_lock:
+            version, angles = self._snapshot
+            updated = angles.copy()
+            updated[indices] = values
+            updated.flags.writeable = False
+            self._snapshot = (version + 1, updated)
+            return version + 1
+
+    def snapshot(self):
+        """Latest committed (version, angles); angles is read-only"""
+        return self._snapshot
+
+    @property
+    def version(self):
+        return self._snapshot[0]
+
+    @property
+    def angles(self):
+        return self._snapshot[1]
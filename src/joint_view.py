@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Joint slider view for the TWIST2 joint controller
+Diffs the joint vector against what the widgets show and touches only the sliders and labels that changed
+"""
+import numpy as np
+
+
+class JointSliderView:
+    """Cached display state of the joint sliders and their value labels
+
+    Sliders are compared at their resolution (after clamping to their range,
+    as Tk does), labels at the precision of their text, so a refresh of a
+    mostly still robot costs a few array operations instead of 58 Tk calls.
+    Tk fires a slider's command for programmatic set() too (at idle); is_echo()
+    recognizes those callbacks so they never re-enter the input path.
+    """
+
+    def __init__(self, sliders, value_labels, lower, upper, format_value,
+                 initial_angles, resolution=0.01, label_resolution=0.001):
+        self.sliders = sliders
+        self.value_labels = value_labels
+        self.lower = np.asarray(lower, dtype=np.float64)
+        self.upper = np.asarray(upper, dtype=np.float64)
+        self.format_value = format_value
+        self.resolution = resolution
+        self.label_resolution = label_resolution
+        self.updating = False  # True while widgets are being set programmatically
+
+        # Last displayed state, seeded with what the widgets were built with
+        self.slider_steps = self._slider_steps(initial_angles)
+        self.label_steps = self._label_steps(initial_angles)
+        self.label_texts = [format_value(angle) for angle in initial_angles]
+        self.widgets_touched = 0
+
+    def _slider_steps(self, angles):
+        clamped = np.clip(np.asarray(angles, dtype=np.float64), self.lower, self.upper)
+        return np.rint(clamped / self.resolution).astype(np.int64)
+
+    def _slider_step(self, joint_idx, value):
+        return int(round(min(max(value, self.lower[joint_idx]), self.upper[joint_idx]) / self.resolution))
+
+    def _label_steps(self, angles):
+        return np.rint(np.asarray(angles, dtype=np.float64) / self.label_resolution).astype(np.int64)
+
+    def render(self, angles):
+        """Bring the widgets up to date with angles; returns the number of widgets touched"""
+        slider_steps = self._slider_steps(angles)
+        label_steps = self._label_steps(angles)
+        touched = 0
+
+        self.updating = True
+        try:
+            for i in np.flatnonzero(slider_steps != self.slider_steps):
+                self.sliders[i].set(slider_steps[i] * self.resolution)
+                touched += 1
+            for i in np.flatnonzero(label_steps != self.label_steps):
+                touched += self._set_label(i, angles[i])
+        finally:
+            self.updating = False
+
+        self.slider_steps = slider_steps
+        self.label_steps = label_steps
+        self.widgets_touched += touched
+        return touched
+
+    def _set_label(self, i, angle):
+        text = self.format_value(angle)
+        if text == self.label_texts[i]:
+            return 0
+        self.label_texts[i] = text
+        self.value_labels[i].config(text=text)
+        return 1
+
+    def is_echo(self, joint_idx, value):
+        """True if a slider callback only reports what the view itself displayed"""
+        if self.updating:
+            return True
+        return self._slider_step(joint_idx, value) == self.slider_steps[joint_idx]
+
+    def accept(self, joint_idx, value):
+        """Record a value the user moved a slider to (the slider already shows it)"""
+        self.slider_steps[joint_idx] = self._slider_step(joint_idx, value)
+        self.label_steps[joint_idx] = round(value / self.label_resolution)
+        self._set_label(joint_idx, value)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Body-part layering for the TWIST2 joint controller
+Composes partial poses from several sources (held poses, scenes, external streams) over the base command per tick
+"""
+import numpy as np
+
+from pose_math import clamp, group_mask
+
+
+# ==================== Sources ====================
+# A source fills `out` with a full joint vector for time `now` and returns
+# True, or returns False when it has nothing to contribute this tick.
+
+class HeldPose:
+    """A fixed pose"""
+
+    def __init__(self, angles):
+        self.angles = clamp(angles)
+
+    def sample(self, now, out):
+        out[:] = self.angles
+        return True
+
+
+class SceneTrack:
+    """A compiled SceneTimeline played from the first tick it is sampled"""
+
+    def __init__(self, timeline, loop=True):
+        self.timeline = timeline
+        self.loop = loop
+        self.start_time = None
+
+    def sample(self, now, out):
+        if self.start_time is None:
+            self.start_time = now
+        local_t, _, _ = self.timeline.locate(now - self.start_time, self.loop)
+        self.timeline.sample_local(local_t, out)
+        return True
+
+
+class StreamSource:
+    """Latest joint vector pushed by an external producer (any thread)
+
+    Samples older than stale_after seconds are ignored, so a stalled stream
+    fades its joints back to the layers below instead of freezing them.
+    """
+
+    def __init__(self, stale_after=0.5):
+        self.stale_after = stale_after
+        self._latest = None  # (timestamp, angles), swapped as one reference
+
+    def push(self, angles, timestamp):
+        """Publish a new vector; timestamp uses the engine clock (time.monotonic)"""
+        self._latest = (timestamp, clamp(angles))
+
+    def sample(self, now, out):
+        latest = self._latest
+        if latest is None or now - latest[0] > self.stale_after:
+            return False
+        out[:] = latest[1]
+        return True
+
+
+# ==================== Mixer ====================
+
+class LayerMixer:
+    """Ordered stack of layers blended over a base joint vector
+
+    Each layer has a source, a joint mask (from body-part groups) and a weight
+    that can fade in and out. Later layers sit on top: per joint, a layer with
+    weight w replaces a fraction w of everything below it. compose() turns the
+    stack into effective per-layer weights and mixes all sources with a
+    single weighted sum.
+    """
+
+    def __init__(self, num_joints=29):
+        self.num_joints = num_joints
+        self.layers = {}  # name -> dict(source, mask, weight_from, weight_to, fade_start, fade_time, remove)
+        self._samples = np.zeros((0, num_joints))
+        self._weights = np.zeros((0, num_joints))
+
+    @property
+    def active(self):
+        return bool(self.layers)
+
+    def set_layer(self, name, groups, source, weight=1.0, fade_time=0.0, now=0.0):
+        """Add or replace a layer driving `groups`; fades from its current weight to `weight`"""
+        current = self._current_weight(self.layers[name], now) if name in self.layers else 0.0
+        self.layers[name] = {
+            'source': source,
+            'mask': group_mask(groups, self.num_joints).astype(np.float64),
+            'groups': groups,
+            'weight_from': current,
+            'weight_to': min(max(weight, 0.0), 1.0),
+            'fade_start': now,
+            'fade_time': max(fade_time, 0.0),
+            'remove': False,
+        }
+        if len(self._samples) < len(self.layers):
+            self._samples = np.zeros((len(self.layers), self.num_joints))
+
+    def remove_layer(self, name, fade_time=0.0, now=0.0):
+        """Fade a layer out and drop it"""
+        layer = self.layers.get(name)
+        if layer is None:
+            return
+        layer['weight_from'] = self._current_weight(layer, now)
+        layer['weight_to'] = 0.0
+        layer['fade_start'] = now
+        layer['fade_time'] = max(fade_time, 0.0)
+        layer['remove'] = True
+
+    @staticmethod
+    def _current_weight(layer, now):
+        if layer['fade_time'] <= 0.0:
+            return layer['weight_to']
+        progress = min(max((now - layer['fade_start']) / layer['fade_time'], 0.0), 1.0)
+        return layer['weight_from'] + (layer['weight_to'] - layer['weight_from']) * progress
+
+    def compose(self, base, now, out):
+        """Write base with every layer blended on top into out; returns out"""
+        layers = self.layers
+        count = len(layers)
+        samples = self._samples[:count]
+        if len(self._weights) != count:
+            self._weights = np.zeros((count, self.num_joints))
+        weights = self._weights
+
+        finished = []
+        for k, (name, layer) in enumerate(layers.items()):
+            weight = self._current_weight(layer, now)
+            if layer['remove'] and weight <= 0.0:
+                finished.append(name)
+            if weight > 0.0 and layer['source'].sample(now, samples[k]):
+                np.multiply(layer['mask'], weight, out=weights[k])
+            else:
+                weights[k] = 0.0
+
+        # Effective weight of layer k: its own weight times what the layers
+        # above it leave visible; the base gets whatever no layer covers
+        keep = 1.0 - weights
+        visible = np.ones((count + 1, self.num_joints))
+        np.cumprod(keep[::-1], axis=0, out=visible[1:])
+        visible = visible[::-1]  # visible[k] = prod(keep[k:]), visible[count] = 1
+        effective = weights * visible[1:]
+
+        np.multiply(base, visible[0], out=out)
+        out += np.einsum('lj,lj->j', effective, samples)
+
+        for name in finished:
+            del layers[name]
+        return out
+
+    def describe(self):
+        """(name, groups, target weight, fading out) for each layer, bottom to top"""
+        return [(name, layer['groups'], layer['weight_to'], layer['remove']) for name, layer in self.layers.items()]
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Wire format for the mimic_obs command published to TWIST2
+Encodes the 35-float observation as JSON (legacy) or packed little-endian binary
+
+Binary layout (little-endian):
+    magic    2s   b"MO"
+    version  u8   format version (1, or 2 for stamped frames)
+    dtype    u8   bytes per value: 4 = float32, 8 = float64
+    count    u16  number of values (35)
+    pad      2x   keeps the float payload 8-byte aligned
+    seq      u64  version 2 only: frame sequence number (1, 2, ...)
+    stamp    f64  version 2 only: publisher time.monotonic() of the frame
+    values   count * dtype
+
+Frame metadata (seq, stamp) can also travel next to the payload, in the sibling
+key "<key>:meta" as {"seq": ..., "ts": ...} (see frame_metadata_key()).
+"""
+import json
+import struct
+import time
+
+import numpy as np
+
+
+MIMIC_OBS_KEY = "action_body_unitree_g1_with_hands"
+MIMIC_OBS_SIZE = 35  # root_vel_xy(2) + root_pos_z(1) + roll_pitch(2) + yaw_ang_vel(1) + dof_pos(29)
+DOF_OFFSET = 6
+ROOT_POS_Z = 0.75    # Standing height
+
+ENCODINGS = ("json", "f32", "f64")
+
+MAGIC = b"MO"
+FORMAT_VERSION = 1
+STAMPED_FORMAT_VERSION = 2
+HEADER = struct.Struct("<2sBBH2x")
+STAMP = struct.Struct("<Qd")  # Follows HEADER in version 2 frames
+
+_DTYPES = {
+    "f32": np.dtype("<f4"),
+    "f64": np.dtype("<f8"),
+}
+_DTYPES_BY_SIZE = {dtype.itemsize: dtype for dtype in _DTYPES.values()}
+
+
+def frame_metadata_key(key):
+    """Sibling key holding the seq/timestamp of the frame in key"""
+    return f"{key}:meta"
+
+
+def encode_frame_metadata(seq, timestamp):
+    """Metadata value for the sibling key"""
+    return f'{{"seq": {seq}, "ts": {timestamp!r}}}'
+
+
+def decode_frame_metadata(value):
+    """(seq, timestamp) from a sibling key value"""
+    meta = json.loads(value)
+    return int(meta["seq"]), float(meta["ts"])
+
+
+def encode_mimic_obs(mimic_obs, encoding="json", seq=None, timestamp=None):
+    """Encode a mimic_obs vector for publishing (str for json, bytes otherwise)
+
+    A binary frame given a seq (and optionally a timestamp) uses the stamped
+    version 2 header.
+    """
+    if encoding == "json":
+        return json.dumps(np.asarray(mimic_obs, dtype=np.float64).tolist())
+
+    if encoding not in _DTYPES:
+        raise ValueError(f"Unknown encoding '{encoding}' (expected one of {ENCODINGS})")
+
+    dtype = _DTYPES[encoding]
+    values = np.ascontiguousarray(mimic_obs, dtype=dtype)
+    if seq is None:
+        return HEADER.pack(MAGIC, FORMAT_VERSION, dtype.itemsize, values.size) + values.tobytes()
+    stamp = STAMP.pack(seq, time.monotonic() if timestamp is None else timestamp)
+    return HEADER.pack(MAGIC, STAMPED_FORMAT_VERSION, dtype.itemsize, values.size) + stamp + values.tobytes()
+
+
+def decode_mimic_obs_frame(payload):
+    """Decode a published payload into (mimic_obs, seq, timestamp)
+
+    seq and timestamp are None unless the frame carries a stamped header.
+    """
+    if isinstance(payload, str):
+        payload = payload.encode()
+
+    if bytes(payload[:2]) != MAGIC:
+        return np.array(json.loads(payload), dtype=np.float64), None, None
+
+    if len(payload) < HEADER.size:
+        raise ValueError("Truncated mimic_obs header")
+
+    _, version, itemsize, count = HEADER.unpack_from(payload)
+    if version not in (FORMAT_VERSION, STAMPED_FORMAT_VERSION):
+        raise ValueError(f"Unsupported mimic_obs format version {version}")
+    if itemsize not in _DTYPES_BY_SIZE:
+        raise ValueError(f"Unsupported mimic_obs value size {itemsize}")
+
+    seq = timestamp = None
+    offset = HEADER.size
+    if version == STAMPED_FORMAT_VERSION:
+        if len(payload) < offset + STAMP.size:
+            raise ValueError("Truncated mimic_obs header")
+        seq, timestamp = STAMP.unpack_from(payload, offset)
+        offset += STAMP.size
+    if len(payload) != offset + count * itemsize:
+        raise ValueError("mimic_obs payload length does not match header")
+
+    values = np.frombuffer(payload, dtype=_DTYPES_BY_SIZE[itemsize], count=count, offset=offset)
+    return values.astype(np.float64), seq, timestamp
+
+
+def decode_mimic_obs(payload):
+    """Decode a published mimic_obs payload (any encoding) into a float64 array"""
+    return decode_mimic_obs_frame(payload)[0]
+
+
+class MimicObsEncoder:
+    """Preallocated mimic_obs encoder for the publish hot path
+
+    The header and constant root fields are written once; each encode() only
+    copies the 29 dof values into a reusable buffer. Binary encodings return a
+    memoryview over that buffer, so nothing is allocated per frame. The view is
+    overwritten by the next encode() and must be consumed before then.
+    With stamped=True, binary frames carry the version 2 header and stamp()
+    fills in each frame's seq and timestamp.
+    """
+
+    def __init__(self, encoding="json", stamped=False):
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown encoding '{encoding}' (expected one of {ENCODINGS})")
+        if stamped and encoding == "json":
+            raise ValueError("Stamped headers need a binary encoding (f32 or f64)")
+        self.encoding = encoding
+        self.stamped = stamped
+
+        dtype = _DTYPES.get(encoding, np.dtype("<f8"))
+        values_offset = HEADER.size + (STAMP.size if stamped else 0)
+        self._buffer = bytearray(values_offset + MIMIC_OBS_SIZE * dtype.itemsize)
+        version = STAMPED_FORMAT_VERSION if stamped else FORMAT_VERSION
+        HEADER.pack_into(self._buffer, 0, MAGIC, version, dtype.itemsize, MIMIC_OBS_SIZE)
+        self._payload = memoryview(self._buffer)
+
+        # Observation vector living inside the payload buffer
+        self.obs = np.frombuffer(self._buffer, dtype=dtype, count=MIMIC_OBS_SIZE, offset=values_offset)
+        self.obs[0:2] = 0.0         # root_vel_xy
+        self.obs[2] = ROOT_POS_Z    # root_pos_z
+        self.obs[3:5] = 0.0         # roll, pitch
+        self.obs[5] = 0.0           # yaw_ang_vel
+        self.dof_pos = self.obs[DOF_OFFSET:]
+
+    def update(self, dof_pos):
+        """Copy the dof values into the observation buffer"""
+        np.copyto(self.dof_pos, dof_pos, casting='same_kind')
+
+    def stamp(self, seq, timestamp):
+        """Write the frame's seq and timestamp into the stamped header"""
+        STAMP.pack_into(self._buffer, HEADER.size, seq, timestamp)
+
+    def payload(self):
+        """Encoded payload for the current observation"""
+        if self.encoding == "json":
+            return json.dumps(self.obs.tolist())
+        return self._payload
+
+    def encode(self, dof_pos):
+        """Copy the dof values into the buffer and return the encoded payload"""
+        self.update(dof_pos)
+        return self.payload()
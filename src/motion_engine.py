@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Headless motion engine for the TWIST2 joint controller
+Computes the commanded joint vector on the publisher's clock: interpolation, holds and scene sequencing
+"""
+import queue
+import threading
+import time
+
+import numpy as np
+
+from layering import LayerMixer, SceneTrack
+from motion_profiles import AUTO_FALLBACK_DURATION, PROFILES, MotionLimits, shape
+from pose_math import group_mask
+from scene_compiler import compile_scene
+
+
+class MotionEngine:
+    """Owns the commanded joint vector; the GUI sends commands and observes events
+
+    tick() is called by the publishing thread once per publish period and commits
+    the resulting vector to the shared JointStateStore. Every other method is
+    safe to call from the Tk thread. Notifications for the GUI are posted to
+    `events` as tuples and must be drained on the Tk thread:
+
+        ('move_complete', name)
+        ('scene_step', step_idx, phase, step, track)   phase is 'moving' or 'holding'
+        ('scene_looped',)
+        ('scene_finished',)
+        ('scene_stopped',)                      a new move_to() cancelled the scene
+
+    Layers (body-part overrides from other sources) are composed on top of the
+    base vector that moves, scenes and manual input drive; the composed vector
+    is what gets committed.
+
+    Moves and scene transitions follow `profile` (see motion_profiles). A
+    duration of "auto" picks the shortest move `limits` allow, and scenes play
+    at `speed` times real time.
+    """
+
+    def __init__(self, joint_state, clock=time.monotonic, profile="linear", limits=None, speed=1.0):
+        self.joint_state = joint_state
+        self.clock = clock
+        self.events = queue.Queue()
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown interpolation profile '{profile}' (expected one of {PROFILES})")
+        self.profile = profile
+        self.limits = limits if limits is not None else MotionLimits()
+        self.speed = speed
+
+        self._lock = threading.Lock()
+        self._angles = np.array(joint_state.angles, dtype=np.float64)
+
+        # Active interpolation
+        self._move = None  # dict(start, delta, start_time, duration, blend, profile, name, on_complete)
+
+        # Active scene: tracks (full body first, then joint groups) on one clock
+        self._scene = None  # dict(tracks, loop, start_time); track = dict(name, steps, timeline, mask, label, iteration)
+        self._track_sample = self._angles.copy()
+
+        # Per-group layers over the base vector
+        self.layers = LayerMixer(len(self._angles))
+        self._output = self._angles.copy()  # Composed vector (base + layers)
+
+    # ==================== Commands (Tk thread) ====================
+
+    @property
+    def busy(self):
+        """True while an interpolation or a scene drives the joints"""
+        return self._move is not None or self._scene is not None
+
+    def set_joints(self, indices, values):
+        """Manual joint input; ignored while a motion or scene is running"""
+        with self._lock:
+            if self.busy:
+                return False
+            self._angles[indices] = values
+            self._commit(self.clock())
+            return True
+
+    def move_to(self, target_angles, duration, name="Target Pose", on_complete=None):
+        """Interpolate from the current command to target over duration seconds (or "auto")"""
+        with self._lock:
+            if self._scene is not None:
+                # An explicit move takes over from scene playback
+                self._scene = None
+                self.events.put(('scene_stopped',))
+            self._start_move(np.array(target_angles, dtype=np.float64), duration, name, on_complete)
+
+    def play_scene(self, steps, poses, loop=False, first_interp_time=3.0, tracks=None):
+        """Play scene steps ({pose_name, hold_time, interp_time}); poses maps name -> angles
+
+        tracks maps joint group -> steps for parts of the body that follow their
+        own timeline; they override the full-body steps on their joints. Every
+        track is compiled separately and all of them share the scene clock.
+        """
+        sources = [('full_body', steps, None)] if steps else []
+        for group, group_steps in (tracks or {}).items():
+            if group_steps:
+                sources.append((group, group_steps, group_mask(group, len(self._angles))))
+        if not sources:
+            raise ValueError("Scene has no steps")
+
+        with self._lock:
+            self._move = None
+            compiled = []
+            for name, track_steps, mask in sources:
+                timeline = compile_scene(track_steps, poses, self._angles, first_interp_time, self.profile, self.limits)
+                self._warn_unbounded_auto(name, track_steps, first_interp_time)
+                self._warn_limits(name, timeline)
+                if loop and not timeline.can_loop:
+                    print(f"⚠️  Warning: Track '{name}' has zero total duration, playing it once")
+                compiled.append({
+                    'name': name,
+                    'steps': list(track_steps),
+                    'timeline': timeline,
+                    'mask': mask,
+                    'label': None,
+                    'iteration': 0,
+                })
+                print(f"Track '{name}' compiled: {len(timeline.starts)} segments, "
+                      f"{timeline.end_time:.1f}s once, {timeline.loop_period:.1f}s per loop")
+            self._scene = {
+                'tracks': compiled,
+                'loop': loop,
+                'start_time': self.clock(),
+                'speed': self.speed,
+            }
+
+    def stop_scene(self):
+        """Stop scene playback (a transition already in progress finishes)"""
+        with self._lock:
+            scene = self._scene
+            if scene is None:
+                return
+            self._scene = None
+
+            # Finish the moves in progress to their poses over the longest remaining time
+            target = self._angles.copy()
+            longest = 0.0
+            name = None
+            for track in scene['tracks']:
+                timeline = track['timeline']
+                local_t, _, _ = timeline.locate(self._scene_time(scene, self.clock()), scene['loop'])
+                k = timeline.segment_index(local_t)
+                remaining = (timeline.starts[k] + timeline.durations[k] - local_t) / scene['speed']
+                if timeline.labels[k][1] != 'moving' or remaining <= 0:
+                    continue
+                end = timeline.segment_end(k)
+                if track['mask'] is None:
+                    target[:] = end
+                else:
+                    target[track['mask']] = end[track['mask']]
+                longest = max(longest, remaining)
+                name = name or track['steps'][timeline.labels[k][0]]['pose_name']
+            if longest > 0:
+                self._start_move(target, longest, name, None, profile="linear")
+
+    def seek_scene(self, t):
+        """Jump (or scrub) scene playback to t seconds from its start"""
+        with self._lock:
+            if self._scene is not None:
+                self._scene['start_time'] = self.clock() - max(t, 0.0) / self._scene['speed']
+
+    def set_speed(self, speed):
+        """Scene playback speed factor (1.0 = as authored); takes effect without a jump"""
+        with self._lock:
+            self.speed = speed
+            scene = self._scene
+            if scene is not None:
+                now = self.clock()
+                position = self._scene_time(scene, now)
+                scene['speed'] = speed
+                scene['start_time'] = now - position / speed
+
+    def set_profile(self, profile):
+        """Interpolation profile for new moves and scenes"""
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown interpolation profile '{profile}' (expected one of {PROFILES})")
+        self.profile = profile
+
+    def scene_position(self):
+        """(position, length) in seconds of the playing scene, or None
+
+        Looping scenes report the position within the first pass of their first
+        track, so the length includes the move back to the first pose. One-shot
+        scenes last until their longest track ends.
+        """
+        scene = self._scene
+        if scene is None:
+            return None
+        elapsed = self._scene_time(scene, self.clock())
+        timeline = scene['tracks'][0]['timeline']
+        if scene['loop'] and timeline.can_loop:
+            local_t, _, _ = timeline.locate(elapsed, True)
+            return local_t, timeline.loop_start + timeline.loop_period
+        length = max(track['timeline'].end_time for track in scene['tracks'])
+        return min(max(elapsed, 0.0), length), length
+
+    def set_layer(self, name, groups, source, weight=1.0, fade_time=0.5):
+        """Drive joint groups from a layering source (HeldPose, SceneTrack, StreamSource)"""
+        with self._lock:
+            self.layers.set_layer(name, groups, source, weight, fade_time, self.clock())
+
+    def layer_scene(self, name, groups, steps, poses, loop=True, weight=1.0, first_interp_time=1.0, fade_time=0.5):
+        """Play scene steps on a layer, starting from the currently commanded vector"""
+        with self._lock:
+            timeline = compile_scene(steps, poses, self.joint_state.angles, first_interp_time, self.profile, self.limits)
+            self._warn_unbounded_auto(f"layer {name}", steps, first_interp_time)
+            self._warn_limits(f"layer {name}", timeline)
+            self.layers.set_layer(name, groups, SceneTrack(timeline, loop), weight, fade_time, self.clock())
+
+    def remove_layer(self, name=None, fade_time=0.5):
+        """Fade out one layer (or all layers) back to the base vector"""
+        with self._lock:
+            names = list(self.layers.layers) if name is None else [name]
+            for layer_name in names:
+                self.layers.remove_layer(layer_name, fade_time, self.clock())
+
+    def describe_layers(self):
+        """LayerMixer.describe() under the engine lock (compose() drops finished layers on the publisher thread)"""
+        with self._lock:
+            return self.layers.describe()
+
+    def set_loop(self, loop):
+        with self._lock:
+            if self._scene is not None:
+                self._scene['loop'] = loop
+
+    # ==================== Clock (publishing thread) ====================
+
+    def tick(self, now=None):
+        """Advance motion to `now` and commit the commanded vector; returns it"""
+        if now is None:
+            now = self.clock()
+
+        callback = None
+        with self._lock:
+            changed = False
+
+            if self._move is not None:
+                move = self._move
+                if move['duration'] <= 0.001:
+                    progress = 1.0
+                else:
+                    progress = min((now - move['start_time']) / move['duration'], 1.0)
+
+                # start + delta * s(progress), s given by the interpolation profile
+                np.multiply(move['delta'], shape(move['profile'], progress, move['blend']), out=self._angles)
+                self._angles += move['start']
+                changed = True
+
+                if progress >= 1.0:
+                    self._move = None
+                    self.events.put(('move_complete', move['name']))
+                    callback = move['on_complete']
+
+            if self._scene is not None:
+                self._tick_scene(now)
+                changed = True
+
+            commanded = self._commit(now) if changed or self.layers.active else self._angles
+
+        if callback is not None:
+            # Outside the lock: the callback may start the next move
+            callback(now)
+        return commanded
+
+    # ==================== Internals (called with the lock held) ====================
+
+    def _commit(self, now):
+        """Commit the base vector, with the layers composed on top if there are any"""
+        if self.layers.active:
+            self.layers.compose(self._angles, now, self._output)
+            self.joint_state.commit(self._output)
+            return self._output
+        self.joint_state.commit(self._angles)
+        return self._angles
+
+    def _scene_time(self, scene, now):
+        return (now - scene['start_time']) * scene['speed']
+
+    def _warn_unbounded_auto(self, name, steps, first_interp_time):
+        uses_auto = first_interp_time == "auto" or any(step.get('interp_time') == "auto" for step in steps)
+        if uses_auto and not self.limits.bounds(np.ones(len(self._angles)), self.profile):
+            print(f"⚠️  Warning: No max_velocity/max_acceleration limit for 'auto' interp times in '{name}', "
+                  f"using {AUTO_FALLBACK_DURATION:.1f}s")
+
+    def _warn_limits(self, name, timeline):
+        overloaded = timeline.loads > 1.0
+        if overloaded.any():
+            print(f"⚠️  Warning: {int(overloaded.sum())} move(s) in '{name}' exceed the joint velocity/acceleration "
+                  f"limits (up to {timeline.loads.max():.1f}x); use 'auto' interp times to fit them")
+
+    def _start_move(self, target, duration, name, on_complete, now=None, profile=None):
+        profile = profile or self.profile
+        start = self._angles.copy()
+        delta = np.asarray(target, dtype=np.float64) - start
+        if duration == "auto" and delta.any() and not self.limits.bounds(delta, profile):
+            print(f"⚠️  Warning: No max_velocity/max_acceleration limit for an 'auto' move to '{name}', "
+                  f"using {AUTO_FALLBACK_DURATION:.1f}s")
+        duration, blend, load = self.limits.plan(delta, duration, profile)
+        self._move = {
+            'start': start,
+            'delta': delta,
+            'start_time': self.clock() if now is None else now,
+            'duration': duration,
+            'blend': blend,
+            'profile': profile,
+            'name': name,
+            'on_complete': on_complete,
+        }
+        if duration <= 0.001:
+            print(f"Instant move to '{name}'")
+        else:
+            peak = f", peak {load:.0%} of joint limits" if load > 0.0 else ""
+            print(f"Interpolating to '{name}' over {duration:.1f}s ({profile}{peak})...")
+            if load > 1.0:
+                print(f"⚠️  Warning: Move to '{name}' exceeds the joint velocity/acceleration limits; "
+                      f"'auto' would take {self.limits.shortest_duration(delta, profile):.1f}s")
+
+    def _tick_scene(self, now):
+        """Sample every scene track, merge them into the command and report step/phase changes"""
+        scene = self._scene
+        all_finished = True
+        for i, track in enumerate(scene['tracks']):
+            timeline = track['timeline']
+            local_t, iteration, finished = timeline.locate(self._scene_time(scene, now), scene['loop'])
+            all_finished = all_finished and finished
+
+            # Finished tracks keep sampling their last pose so they hold it
+            if track['mask'] is None:
+                k = timeline.sample_local(local_t, self._angles)
+            else:
+                k = timeline.sample_local(local_t, self._track_sample)
+                np.copyto(self._angles, self._track_sample, where=track['mask'])
+
+            if iteration > track['iteration']:
+                track['iteration'] = iteration
+                if i == 0:
+                    self.events.put(('scene_looped',))
+
+            if finished:
+                continue  # end_time is the start of the loop-back move, which never plays
+            label = timeline.labels[k]
+            if label != track['label']:
+                track['label'] = label
+                step_idx, phase = label
+                self.events.put(('scene_step', step_idx, phase, track['steps'][step_idx], track['name']))
+
+        if all_finished:
+            self._scene = None
+            self.events.put(('scene_finished',))
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Interpolation profiles for the TWIST2 joint controller
+Time-scaling curves (linear, cubic, minimum-jerk, trapezoidal) and velocity/acceleration-limited transition planning
+"""
+import math
+
+import numpy as np
+
+PROFILES = ("linear", "cubic", "min_jerk", "trapezoidal")
+
+# Peak of ds/dp and |d2s/dp2| for the fixed-shape profiles (s = progress curve, p = normalized time)
+PEAK_VELOCITY = {"linear": 1.0, "cubic": 1.5, "min_jerk": 1.875}
+PEAK_ACCELERATION = {"linear": 0.0, "cubic": 6.0, "min_jerk": 10.0 / math.sqrt(3.0)}  # Linear: instant velocity steps
+
+DEFAULT_BLEND = 0.25  # Preferred acceleration fraction of a trapezoidal move
+MIN_BLEND = 1e-3      # Shortest ramp; a velocity-only limit drives the blend towards 0 (a linear cruise)
+AUTO_FALLBACK_DURATION = 2.0  # Seconds for an "auto" move that no finite limit bounds
+
+
+def shape(profile, p, blend=DEFAULT_BLEND):
+    """Fraction of the move completed at normalized time p (0..1)"""
+    if p <= 0.0:
+        return 0.0
+    if p >= 1.0:
+        return 1.0
+    if profile == "linear":
+        return p
+    if profile == "cubic":
+        return p * p * (3.0 - 2.0 * p)
+    if profile == "min_jerk":
+        return p * p * p * (10.0 + p * (-15.0 + 6.0 * p))
+    # Trapezoidal velocity: accelerate for `blend`, cruise, decelerate for `blend`
+    scale = 1.0 / (2.0 * blend * (1.0 - blend))
+    if p < blend:
+        return p * p * scale
+    if p > 1.0 - blend:
+        return 1.0 - (1.0 - p) * (1.0 - p) * scale
+    return (p - 0.5 * blend) / (1.0 - blend)
+
+
+def _peak_factors(profile, blend):
+    if profile == "trapezoidal":
+        return 1.0 / (1.0 - blend), 1.0 / (blend * (1.0 - blend))
+    return PEAK_VELOCITY[profile], PEAK_ACCELERATION[profile]
+
+
+class MotionLimits:
+    """Per-joint velocity (rad/s) and acceleration (rad/s^2) limits
+
+    Either limit may be a scalar (same for every joint), a per-joint list or
+    None (unlimited). plan() turns a joint-space move into a duration and
+    trapezoid blend that respect them.
+    """
+
+    def __init__(self, max_velocity=None, max_acceleration=None, num_joints=29):
+        self.max_velocity = self._as_array(max_velocity, num_joints)
+        self.max_acceleration = self._as_array(max_acceleration, num_joints)
+
+    @staticmethod
+    def _as_array(limit, num_joints):
+        if limit is None:
+            return np.full(num_joints, np.inf)
+        return np.broadcast_to(np.asarray(limit, dtype=np.float64), (num_joints,)).copy()
+
+    def _ratios(self, distance, duration):
+        """Worst-case distance / (v T) and distance / (a T^2) over all joints"""
+        if duration <= 0.0:
+            return math.inf, math.inf
+        r_v = float(np.max(distance / (self.max_velocity * duration)))
+        r_a = float(np.max(distance / (self.max_acceleration * duration * duration)))
+        return r_v, r_a
+
+    def _trapezoid_blend(self, r_v, r_a):
+        """Blend satisfying both limits, or None if the duration is too short"""
+        if r_a > 0.25:
+            return None
+        min_blend = (1.0 - math.sqrt(1.0 - 4.0 * r_a)) / 2.0  # Acceleration bound
+        max_blend = min(0.5, 1.0 - r_v)                       # Velocity bound
+        if max(min_blend, MIN_BLEND) > max_blend:
+            return None
+        return min(max(DEFAULT_BLEND, min_blend, MIN_BLEND), max_blend)
+
+    def bounds(self, delta, profile):
+        """True if a finite limit on a moving joint gives "auto" a nonzero duration"""
+        moving = np.abs(np.asarray(delta, dtype=np.float64)) > 0.0
+        limited = np.isfinite(self.max_velocity)
+        if profile == "trapezoidal" or PEAK_ACCELERATION[profile] > 0.0:
+            limited = limited | np.isfinite(self.max_acceleration)
+        return bool((moving & limited).any())
+
+    def shortest_duration(self, delta, profile):
+        """Shortest duration for which the worst-case joint stays within its limits"""
+        distance = np.abs(np.asarray(delta, dtype=np.float64))
+        if not distance.any():
+            return 0.0
+
+        if profile != "trapezoidal":
+            peak_v, peak_a = _peak_factors(profile, DEFAULT_BLEND)
+            duration = float(np.max(distance * peak_v / self.max_velocity))
+            if peak_a > 0.0:
+                duration = max(duration, math.sqrt(float(np.max(distance * peak_a / self.max_acceleration))))
+            return duration
+
+        # Trapezoid shared by all joints: bisect on the duration (feasibility is monotonic)
+        low = 0.0
+        high = max(float(np.max(distance / self.max_velocity)), 1e-3)
+        while self._trapezoid_blend(*self._ratios(distance, high)) is None:
+            low, high = high, high * 2.0
+        for _ in range(40):
+            middle = (low + high) / 2.0
+            if self._trapezoid_blend(*self._ratios(distance, middle)) is None:
+                low = middle
+            else:
+                high = middle
+        return high
+
+    def plan(self, delta, duration, profile):
+        """Plan a move by delta: returns (duration, blend, load)
+
+        duration may be "auto" for the shortest feasible move (or
+        AUTO_FALLBACK_DURATION if no limit bounds it, see bounds()). load is the
+        worst ratio of peak velocity or acceleration to its limit (above 1.0
+        means the requested duration is too short for the hardware).
+        """
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown interpolation profile '{profile}' (expected one of {PROFILES})")
+        distance = np.abs(np.asarray(delta, dtype=np.float64))
+        if duration == "auto":
+            if distance.any() and not self.bounds(distance, profile):
+                duration = AUTO_FALLBACK_DURATION  # Unlimited joints would snap to the target
+            else:
+                duration = self.shortest_duration(distance, profile)
+        duration = max(float(duration), 0.0)
+        if duration <= 0.0 or not distance.any():
+            return duration, DEFAULT_BLEND, 0.0
+
+        r_v, r_a = self._ratios(distance, duration)
+        blend = DEFAULT_BLEND
+        if profile == "trapezoidal":
+            blend = self._trapezoid_blend(r_v, r_a)
+            if blend is None:
+                blend = 0.5 if r_a > 0.25 else min(max((1.0 - math.sqrt(1.0 - 4.0 * r_a)) / 2.0, 0.01), 0.5)
+        peak_v, peak_a = _peak_factors(profile, blend)
+        return duration, blend, max(r_v * peak_v, r_a * peak_a)
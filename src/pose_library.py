@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+In-memory pose library for the TWIST2 joint controller
+Loads the pose store once and reloads only when the stored data changes
+"""
+import numpy as np
+
+from pose_store import PoseYamlStore
+
+
+class PoseLibrary:
+    """Cached view of a pose store (YamlStore or SqliteStore)
+
+    Pose metadata is kept as stored; the angles of every pose with the expected
+    number of joints are stacked into one read-only float32 (N x num_joints)
+    array, so looking a pose up is a dict lookup plus a row view. Saves and
+    deletes update the cache in place instead of reloading it.
+    """
+
+    def __init__(self, store, num_joints=29):
+        if not hasattr(store, 'load_all'):
+            store = PoseYamlStore(store)  # A plain path means a YAML pose file
+        self.store = store
+        self.num_joints = num_joints
+
+        self._signature = None  # Store signature of the cached data
+        self.entries = {}       # name -> pose dict as stored
+        self.index = {}         # name -> row in matrix (valid poses only)
+        self.matrix = np.zeros((0, num_joints), dtype=np.float32)
+
+    def refresh(self):
+        """Reload the store if it changed; returns True if it was reloaded"""
+        signature = self.store.signature()
+        if signature == self._signature:
+            return False
+
+        self._load(self.store.load_all())
+        self._signature = signature
+        return True
+
+    def _valid_angles(self, pose):
+        angles = pose.get('angles') if isinstance(pose, dict) else None
+        if angles is not None and len(angles) == self.num_joints:
+            return angles
+        return None
+
+    def _load(self, data):
+        """Rebuild the cache from {name: pose} data"""
+        self.entries = dict(data)
+        self.index = {}
+        rows = []
+        for name, pose in self.entries.items():
+            angles = self._valid_angles(pose)
+            if angles is not None:
+                self.index[name] = len(rows)
+                rows.append(angles)
+
+        self.matrix = np.array(rows, dtype=np.float32).reshape(len(rows), self.num_joints)
+        self.matrix.flags.writeable = False
+
+    # ==================== Queries ====================
+
+    def names(self):
+        """All pose names in stored order"""
+        self.refresh()
+        return list(self.entries.keys())
+
+    def __contains__(self, name):
+        self.refresh()
+        return name in self.entries
+
+    def __len__(self):
+        self.refresh()
+        return len(self.entries)
+
+    def entry(self, name):
+        """Stored pose dict (angles, joint_names, timestamp, description)"""
+        self.refresh()
+        return self.entries[name]
+
+    def angles(self, name):
+        """Joint angles of a pose as a read-only float32 row (KeyError if missing or malformed)"""
+        self.refresh()
+        return self.matrix[self.index[name]]
+
+    # ==================== Updates ====================
+
+    def save(self, name, pose):
+        """Add or replace a pose"""
+        self.refresh()
+        self.store.upsert(name, pose, self.entries)
+        self.entries = dict(self.entries)
+        self.entries[name] = pose
+
+        # Patch the stacked array (copy-on-write keeps handed-out rows valid)
+        angles = self._valid_angles(pose)
+        if angles is None:
+            if name in self.index:
+                self._remove_row(name)
+        elif name in self.index:
+            matrix = self.matrix.copy()
+            matrix[self.index[name]] = angles
+            matrix.flags.writeable = False
+            self.matrix = matrix
+        else:
+            self.index[name] = len(self.matrix)
+            matrix = np.vstack([self.matrix, np.asarray(angles, dtype=np.float32)[None, :]])
+            matrix.flags.writeable = False
+            self.matrix = matrix
+        self._signature = self.store.signature()
+
+    def delete(self, name):
+        """Remove a pose"""
+        self.refresh()
+        self.store.delete(name, self.entries)
+        self.entries = dict(self.entries)
+        del self.entries[name]
+
+        if name in self.index:
+            self._remove_row(name)
+        self._signature = self.store.signature()
+
+    def _remove_row(self, name):
+        row = self.index.pop(name)
+        matrix = np.delete(self.matrix, row, axis=0)
+        matrix.flags.writeable = False
+        self.matrix = matrix
+        self.index = {n: (r - 1 if r > row else r) for n, r in self.index.items()}
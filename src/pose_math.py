@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Pose math for the Unitree G1 (29 DOF)
+Joint tables as arrays and vectorized mirror/clamp/blend/offset on one pose or an (N x 29) batch
+
+Usage (batch edit a pose library in place, or into --output):
+    python src/pose_math.py clamp examples/saved_poses.yaml
+    python src/pose_math.py mirror examples/saved_poses.yaml --direction right_to_left --select 'tchau_*' --suffix _mirrored
+    python src/pose_math.py offset examples/saved_poses.yaml --joint waist_pitch=0.05 --joint left_elbow=-0.1
+    python src/pose_math.py blend examples/saved_poses.yaml --between em_pe semi_agachado --weight 0.5 --name meio
+"""
+import argparse
+import fnmatch
+import time
+from pathlib import Path
+
+import numpy as np
+
+from pose_store import PoseYamlStore, SqliteStore
+
+NUM_JOINTS = 29
+
+JOINT_NAMES = [
+    # Legs (0-11)
+    "left_hip_pitch", "left_hip_roll", "left_hip_yaw",
+    "left_knee", "left_ankle_pitch", "left_ankle_roll",
+    "right_hip_pitch", "right_hip_roll", "right_hip_yaw",
+    "right_knee", "right_ankle_pitch", "right_ankle_roll",
+    # Waist (12-14)
+    "waist_yaw", "waist_roll", "waist_pitch",
+    # Arms (15-28)
+    "left_shoulder_pitch", "left_shoulder_roll", "left_shoulder_yaw",
+    "left_elbow", "left_wrist_roll", "left_wrist_pitch", "left_wrist_yaw",
+    "right_shoulder_pitch", "right_shoulder_roll", "right_shoulder_yaw",
+    "right_elbow", "right_wrist_roll", "right_wrist_pitch", "right_wrist_yaw"
+]
+
+# Joint limits from URDF: g1_29dof_rev_1_0.urdf
+JOINT_LIMITS = [
+    (-2.5307, 2.8798),   # left_hip_pitch
+    (-0.5236, 2.9671),   # left_hip_roll
+    (-2.7576, 2.7576),   # left_hip_yaw
+    (-0.0873, 2.8798),   # left_knee
+    (-0.8727, 0.5236),   # left_ankle_pitch
+    (-0.2618, 0.2618),   # left_ankle_roll
+    (-2.5307, 2.8798),   # right_hip_pitch
+    (-2.9671, 0.5236),   # right_hip_roll
+    (-2.7576, 2.7576),   # right_hip_yaw
+    (-0.0873, 2.8798),   # right_knee
+    (-0.8727, 0.5236),   # right_ankle_pitch
+    (-0.2618, 0.2618),   # right_ankle_roll
+    (-2.618, 2.618),     # waist_yaw
+    (-0.52, 0.52),       # waist_roll
+    (-0.52, 0.52),       # waist_pitch
+    (-3.0892, 2.6704),   # left_shoulder_pitch (-177° to 153°)
+    (-1.5882, 2.2515),   # left_shoulder_roll (-91° to 129°)
+    (-2.618, 2.618),     # left_shoulder_yaw (-150° to 150°)
+    (-1.0472, 2.0944),   # left_elbow (-60° to 120°)
+    (-1.9722, 1.9722),   # left_wrist_roll (-113° to 113°)
+    (-1.6144, 1.6144),   # left_wrist_pitch (-92° to 92°)
+    (-1.6144, 1.6144),   # left_wrist_yaw (-92° to 92°)
+    (-3.0892, 2.6704),   # right_shoulder_pitch (-177° to 153°)
+    (-2.2515, 1.5882),   # right_shoulder_roll (-129° to 91°)
+    (-2.618, 2.618),     # right_shoulder_yaw (-150° to 150°)
+    (-1.0472, 2.0944),   # right_elbow (-60° to 120°)
+    (-1.9722, 1.9722),   # right_wrist_roll (-113° to 113°)
+    (-1.6144, 1.6144),   # right_wrist_pitch (-92° to 92°)
+    (-1.6144, 1.6144),   # right_wrist_yaw (-92° to 92°)
+]
+
+# Joint pairs mapping: left_idx -> (right_idx, flip_sign)
+# flip_sign=True means negate the value (e.g., for roll joints)
+JOINT_PAIRS = {
+    # Left leg -> Right leg
+    0: (6, False),   # hip_pitch
+    1: (7, True),    # hip_roll (flip sign)
+    2: (8, True),    # hip_yaw (flip sign)
+    3: (9, False),   # knee
+    4: (10, False),  # ankle_pitch
+    5: (11, True),   # ankle_roll (flip sign)
+    # Left arm -> Right arm
+    15: (22, False),  # shoulder_pitch
+    16: (23, True),   # shoulder_roll (flip sign)
+    17: (24, True),   # shoulder_yaw (flip sign)
+    18: (25, False),  # elbow
+    19: (26, False),  # wrist_roll
+    20: (27, False),  # wrist_pitch
+    21: (28, False),  # wrist_yaw
+}
+
+# Body-part groups as [start, end) index ranges (the slider panel layout)
+JOINT_GROUPS = {
+    "left_leg": (0, 6),
+    "right_leg": (6, 12),
+    "waist": (12, 15),
+    "left_arm": (15, 22),
+    "right_arm": (22, 29),
+}
+
+# Shorthands for common group combinations
+GROUP_ALIASES = {
+    "legs": ("left_leg", "right_leg"),
+    "arms": ("left_arm", "right_arm"),
+    "upper_body": ("waist", "left_arm", "right_arm"),
+    "all": tuple(JOINT_GROUPS),
+}
+
+# Unpaired joints that change sign in a left/right swap (yaw and roll about the body axis)
+CENTER_FLIPS = (12, 13)  # waist_yaw, waist_roll
+
+MIRROR_DIRECTIONS = ("left_to_right", "right_to_left", "swap")
+
+
+def limit_arrays(joint_limits):
+    """(lower, upper) float64 arrays from a list of (min, max) tuples"""
+    limits = np.array(joint_limits, dtype=np.float64)
+    return limits[:, 0].copy(), limits[:, 1].copy()
+
+
+def mirror_tables(joint_pairs, num_joints=NUM_JOINTS, center_flips=CENTER_FLIPS):
+    """Permutation and sign arrays for a full left/right swap
+
+    mirrored = pose[..., permutation] * sign maps every paired joint to its
+    counterpart (and back), keeps unpaired joints in place and negates the
+    flipped ones.
+    """
+    permutation = np.arange(num_joints)
+    sign = np.ones(num_joints)
+    for left, (right, flip) in joint_pairs.items():
+        permutation[left], permutation[right] = right, left
+        if flip:
+            sign[left] = sign[right] = -1.0
+    sign[list(center_flips)] = -1.0
+    return permutation, sign
+
+
+JOINT_LOWER, JOINT_UPPER = limit_arrays(JOINT_LIMITS)
+MIRROR_PERMUTATION, MIRROR_SIGN = mirror_tables(JOINT_PAIRS)
+LEFT_JOINTS = np.array(sorted(JOINT_PAIRS))
+RIGHT_JOINTS = MIRROR_PERMUTATION[LEFT_JOINTS]
+PAIR_SIGN = MIRROR_SIGN[LEFT_JOINTS]
+
+
+def group_mask(groups, num_joints=NUM_JOINTS):
+    """Boolean joint mask for a group name (or alias) or a list of them"""
+    if isinstance(groups, str):
+        groups = [groups]
+    mask = np.zeros(num_joints, dtype=bool)
+    for group in groups:
+        for name in GROUP_ALIASES.get(group, (group,)):
+            if name not in JOINT_GROUPS:
+                raise ValueError(f"Unknown joint group '{name}' (expected one of {list(JOINT_GROUPS) + list(GROUP_ALIASES)})")
+            start, end = JOINT_GROUPS[name]
+            mask[start:end] = True
+    return mask
+
+
+# ==================== Operations (one pose or an N x 29 batch) ====================
+
+def mirror(poses, direction="left_to_right", out=None):
+    """Mirror poses: copy one side onto the other, or swap sides ('swap')"""
+    poses = np.asarray(poses, dtype=np.float64)
+    if direction == "swap":
+        result = poses[..., MIRROR_PERMUTATION] * MIRROR_SIGN
+        if out is None:
+            return result
+        out[...] = result
+        return out
+
+    if direction == "left_to_right":
+        source, target = LEFT_JOINTS, RIGHT_JOINTS
+    elif direction == "right_to_left":
+        source, target = RIGHT_JOINTS, LEFT_JOINTS
+    else:
+        raise ValueError(f"Unknown mirror direction '{direction}' (expected one of {MIRROR_DIRECTIONS})")
+
+    if out is None:
+        out = poses.copy()
+    elif out is not poses:
+        out[...] = poses
+    out[..., target] = poses[..., source] * PAIR_SIGN
+    return out
+
+
+def clamp(poses, out=None):
+    """Clip poses to the joint limits"""
+    return np.clip(np.asarray(poses, dtype=np.float64), JOINT_LOWER, JOINT_UPPER, out=out)
+
+
+def out_of_limits(poses, tolerance=1e-9):
+    """Boolean mask (same shape as poses) of joints outside their limits"""
+    poses = np.asarray(poses, dtype=np.float64)
+    return (poses < JOINT_LOWER - tolerance) | (poses > JOINT_UPPER + tolerance)
+
+
+def blend(a, b, weight, out=None):
+    """a + (b - a) * weight; weight is a scalar, a per-joint array or a per-pose column
+
+    out may be b (or a new array) but not a.
+    """
+    a = np.asarray(a, dtype=np.float64)
+    result = np.subtract(b, a, out=out)
+    result *= weight
+    result += a
+    return result
+
+
+def offset(poses, offsets, limit=True, out=None):
+    """Add per-joint offsets, clipped to the joint limits unless limit=False"""
+    result = np.add(poses, offsets, out=out)
+    if limit:
+        np.clip(result, JOINT_LOWER, JOINT_UPPER, out=result)
+    return result
+
+
+def joint_vector(assignments, base=0.0):
+    """29-vector from {joint name or index: value} (other joints set to base)"""
+    vector = np.full(NUM_JOINTS, base, dtype=np.float64)
+    for joint, value in assignments.items():
+        vector[joint if isinstance(joint, int) else JOINT_NAMES.index(joint)] = value
+    return vector
+
+
+# ==================== Batch CLI ====================
+
+def _open_store(path):
+    if Path(path).suffix == ".db":
+        return SqliteStore(path, "poses")
+    return PoseYamlStore(path, JOINT_NAMES)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch mirror/clamp/offset/blend poses in a pose library")
+    parser.add_argument("operation", choices=["mirror", "clamp", "offset", "blend"])
+    parser.add_argument("library", help="Pose file (.yaml) or SQLite library (.db)")
+    parser.add_argument("--output", help="Write the result here instead of updating the library in place")
+    parser.add_argument("--select", default="*", help="Glob of pose names to process (default: all)")
+    parser.add_argument("--direction", choices=MIRROR_DIRECTIONS, default="left_to_right")
+    parser.add_argument("--joint", action="append", default=[], metavar="NAME=DELTA", help="Offset for one joint (repeatable)")
+    parser.add_argument("--between", nargs=2, metavar=("POSE_A", "POSE_B"), help="Poses to blend")
+    parser.add_argument("--weight", type=float, default=0.5, help="Blend weight of POSE_B")
+    parser.add_argument("--name", help="Name of the blended pose")
+    parser.add_argument("--suffix", default="", help="Save results as new poses named <pose><suffix>")
+    parser.add_argument("--no-clamp", action="store_true", help="Do not clip results to the joint limits")
+    args = parser.parse_args()
+
+    store = _open_store(args.library)
+    entries = store.load_all()
+
+    # Stack every selected, well-formed pose into one batch
+    names = [name for name, pose in entries.items()
+             if fnmatch.fnmatchcase(name, args.select)
+             and isinstance(pose, dict) and len(pose.get('angles') or ()) == NUM_JOINTS]
+    batch = np.array([entries[name]['angles'] for name in names], dtype=np.float64).reshape(len(names), NUM_JOINTS)
+
+    if args.operation == "blend":
+        if not args.between or not args.name:
+            parser.error("blend needs --between POSE_A POSE_B and --name")
+        a, b = (np.asarray(entries[name]['angles'], dtype=np.float64) for name in args.between)
+        names, batch = [args.name], blend(a, b, args.weight)[None, :]
+        args.suffix = ""
+    elif args.operation == "mirror":
+        mirror(batch, args.direction, out=batch)
+    elif args.operation == "offset":
+        deltas = {}
+        for item in args.joint:
+            joint, _, delta = item.partition("=")
+            if joint not in JOINT_NAMES:
+                parser.error(f"Unknown joint '{joint}'")
+            deltas[joint] = float(delta)
+        offset(batch, joint_vector(deltas), limit=False, out=batch)
+
+    clipped = int(out_of_limits(batch).any(axis=1).sum())
+    if not args.no_clamp:
+        clamp(batch, out=batch)
+
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+    for name, row in zip(names, batch):
+        new_name = name + args.suffix
+        pose = dict(entries.get(new_name) or entries.get(name) or {})
+        pose['angles'] = row.tolist()
+        pose['joint_names'] = JOINT_NAMES
+        pose['timestamp'] = timestamp
+        pose.setdefault('description', f"{args.operation}: {name}")
+        entries[new_name] = pose
+
+    target = _open_store(args.output) if args.output else store
+    target.dump_all(entries)
+    action = "clamped" if args.operation == "clamp" else f"{args.operation} applied"
+    print(f"✅ {len(names)} poses {action}, {clipped} outside joint limits"
+          f"{'' if args.no_clamp else ' (clamped)'} -> {args.output or args.library}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Storage backends for saved poses and scenes
+YAML files (the original format, now written atomically) or SQLite with per-entry upserts
+
+Pose files use schema v2: one joint-name header, one flow-style angle list per
+pose and, optionally, all angles packed into a .npz sidecar. v1 files (a
+joint_names list repeated in every pose) are detected and migrated on load;
+the next save writes v2.
+
+Usage (convert between the formats):
+    python src/pose_store.py import library.db --poses examples/saved_poses.yaml --scenes examples/saved_scenes.yaml
+    python src/pose_store.py export library.db --poses poses.yaml --scenes scenes.yaml
+    python src/pose_store.py migrate examples/saved_poses.yaml [--npz]
+"""
+import argparse
+import io
+import json
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+# libyaml bindings are several times faster; fall back to pure Python without them
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+SafeDumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+POSE_SCHEMA_VERSION = 2
+
+
+class FlowList(list):
+    """List written in YAML flow style ([a, b, c]) on a single line"""
+
+
+class _Dumper(SafeDumper):
+    pass
+
+
+_Dumper.add_representer(
+    FlowList, lambda dumper, data: dumper.represent_sequence('tag:yaml.org,2002:seq', data, flow_style=True)
+)
+
+
+def load_yaml(path):
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=SafeLoader)
+
+
+def dump_yaml(data):
+    return yaml.dump(data, Dumper=_Dumper, default_flow_style=False, sort_keys=False, width=4096)
+
+
+def atomic_write_text(path, text):
+    """Write a file so readers (and crashes) only ever see the old or the new content"""
+    atomic_write_bytes(path, text.encode('utf-8'))
+
+
+def atomic_write_bytes(path, data):
+    """Binary counterpart of atomic_write_text"""
+    path = Path(path)
+    mode = path.stat().st_mode & 0o777 if path.exists() else 0o644
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        os.fchmod(fd, mode)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class YamlStore:
+    """{name: entry} mapping kept in one YAML file; every write rewrites the file atomically"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def signature(self):
+        """Changes whenever the stored data changes (mtime and size of the file)"""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load_all(self):
+        if not self.path.exists():
+            return {}
+        return load_yaml(self.path) or {}
+
+    def dump_all(self, entries):
+        atomic_write_text(self.path, dump_yaml(entries))
+
+    def upsert(self, name, entry, entries=None):
+        """Add or replace one entry (entries: current contents, if the caller has them)"""
+        entries = dict(self.load_all() if entries is None else entries)
+        entries[name] = entry
+        self.dump_all(entries)
+
+    def delete(self, name, entries=None):
+        entries = dict(self.load_all() if entries is None else entries)
+        del entries[name]
+        self.dump_all(entries)
+
+
+def decode_pose_file(data, base_dir=None):
+    """Parse a loaded pose file (v1 or v2) into (joint_names header, {name: entry})
+
+    Entries come back in the v1 shape ('angles' and 'joint_names' per pose),
+    so callers and the SQLite store do not depend on the file format. A
+    relative angles_file is resolved against base_dir (the YAML file's directory).
+    """
+    if not data:
+        return None, {}
+
+    if data.get('format_version') is None:
+        # v1: {name: {angles, joint_names, ...}}; the first pose's names become the header
+        joint_names = next((pose['joint_names'] for pose in data.values()
+                            if isinstance(pose, dict) and 'joint_names' in pose), None)
+        return joint_names, data
+
+    version = data['format_version']
+    if version > POSE_SCHEMA_VERSION:
+        raise ValueError(f"Pose file format v{version} is newer than supported (v{POSE_SCHEMA_VERSION})")
+
+    joint_names = data.get('joint_names')
+    entries = {}
+    for name, pose in (data.get('poses') or {}).items():
+        pose = dict(pose or {})
+        if joint_names is not None:
+            pose.setdefault('joint_names', joint_names)
+        entries[name] = pose
+
+    angles_file = data.get('angles_file')
+    if angles_file:
+        # Packed angles: one row per pose in the .npz sidecar next to the YAML file
+        with np.load(Path(base_dir or '.') / angles_file) as packed:
+            for name, row in zip(packed['names'].tolist(), packed['angles'].tolist()):
+                if name in entries:
+                    entries[name]['angles'] = row
+    return joint_names, entries
+
+
+def encode_pose_file(entries, joint_names=None, angles_file=None):
+    """Build the v2 document for {name: entry}; returns (document, packed angles or None)
+
+    Per-pose joint_names equal to the header are dropped. With angles_file set,
+    angles of the right length are left out of the YAML and returned as
+    (names, rows) for the .npz sidecar.
+    """
+    if joint_names is None:
+        joint_names = next((pose['joint_names'] for pose in entries.values() if 'joint_names' in pose), None)
+    joint_names = list(joint_names) if joint_names is not None else None
+
+    poses = {}
+    names, rows = [], []
+    for name, pose in entries.items():
+        pose = dict(pose)
+        if pose.get('joint_names') is not None and list(pose['joint_names']) == joint_names:
+            del pose['joint_names']
+        angles = pose.pop('angles', None)
+        if angles is not None:
+            if angles_file and (joint_names is None or len(angles) == len(joint_names)):
+                names.append(name)
+                rows.append(angles)
+            else:
+                # Angles first, on one line
+                pose = dict(angles=FlowList(float(a) for a in angles), **pose)
+        poses[name] = pose
+
+    document = {'format_version': POSE_SCHEMA_VERSION}
+    if joint_names is not None:
+        document['joint_names'] = FlowList(joint_names)
+    packed = None
+    if angles_file:
+        document['angles_file'] = angles_file
+        packed = (names, rows)
+    document['poses'] = poses
+    return document, packed
+
+
+class PoseYamlStore(YamlStore):
+    """Pose file in schema v2 (reads v1 too); optionally packs angles into a .npz sidecar
+
+    Each save writes a new numbered sidecar (<stem>.<generation>.npz) that the
+    YAML file's angles_file points to. The YAML rename switches both at once,
+    and only then are the older sidecars removed.
+    """
+
+    def __init__(self, path, joint_names=None, npz_sidecar=False):
+        super().__init__(path)
+        self.joint_names = list(joint_names) if joint_names is not None else None
+        self.npz_sidecar = npz_sidecar
+
+    def sidecars(self):
+        """{generation: path} of the numbered sidecars next to the YAML file"""
+        found = {}
+        for path in self.path.parent.glob(f"{self.path.stem}.*.npz"):
+            generation = path.name[len(self.path.stem) + 1:-len('.npz')]
+            if generation.isdigit():
+                found[int(generation)] = path
+        return found
+
+    def load_all(self):
+        if not self.path.exists():
+            return {}
+        joint_names, entries = decode_pose_file(load_yaml(self.path), self.path.parent)
+        if joint_names is not None:
+            self.joint_names = list(joint_names)
+        return entries
+
+    def dump_all(self, entries):
+        old_sidecars = self.sidecars()
+        sidecar_path = None
+        if self.npz_sidecar:
+            sidecar_path = self.path.with_name(f"{self.path.stem}.{max(old_sidecars, default=0) + 1}.npz")
+        document, packed = encode_pose_file(
+            entries, self.joint_names, sidecar_path.name if sidecar_path is not None else None
+        )
+        if packed is not None:
+            # New sidecar first, under a new name: the current YAML still points at the old one
+            names, rows = packed
+            buffer = io.BytesIO()
+            np.savez(buffer, names=np.array(names, dtype=str),
+                     angles=np.array(rows, dtype=np.float64).reshape(len(rows), -1))
+            atomic_write_bytes(sidecar_path, buffer.getvalue())
+        atomic_write_text(self.path, dump_yaml(document))
+        # The YAML rename published the new library; nothing references the old sidecars now
+        for path in list(old_sidecars.values()) + [self.path.with_suffix('.npz')]:
+            path.unlink(missing_ok=True)
+
+
+class SqliteStore:
+    """{name: entry} mapping kept in an SQLite table; upserts and deletes touch one row
+
+    Poses and scenes share one database file, separated by `kind`. Writes are
+    transactions (atomic and crash-safe); a generation counter lets caches
+    detect changes made by other processes.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            kind TEXT NOT NULL,
+            name TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (kind, name)
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            kind TEXT PRIMARY KEY,
+            generation INTEGER NOT NULL
+        );
+    """
+
+    def __init__(self, path, kind):
+        self.path = Path(path)
+        self.kind = kind
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.executescript(self.SCHEMA)
+            self.conn.execute("INSERT OR IGNORE INTO meta (kind, generation) VALUES (?, 0)", (self.kind,))
+
+    def signature(self):
+        row = self.conn.execute("SELECT generation FROM meta WHERE kind = ?", (self.kind,)).fetchone()
+        return row[0]
+
+    def _bump(self):
+        self.conn.execute("UPDATE meta SET generation = generation + 1 WHERE kind = ?", (self.kind,))
+
+    def load_all(self):
+        rows = self.conn.execute(
+            "SELECT name, data FROM entries WHERE kind = ? ORDER BY position", (self.kind,)
+        )
+        return {name: json.loads(data) for name, data in rows}
+
+    def dump_all(self, entries):
+        """Replace the whole collection (used by imports)"""
+        with self.conn:
+            self.conn.execute("DELETE FROM entries WHERE kind = ?", (self.kind,))
+            self.conn.executemany(
+                "INSERT INTO entries (kind, name, position, data) VALUES (?, ?, ?, ?)",
+                [(self.kind, name, i, json.dumps(entry)) for i, (name, entry) in enumerate(entries.items())]
+            )
+            self._bump()
+
+    def upsert(self, name, entry, entries=None):
+        """Add or replace one entry (existing entries keep their position)"""
+        with self.conn:
+            self.conn.execute(
+                """INSERT INTO entries (kind, name, position, data)
+                   VALUES (?, ?, (SELECT COALESCE(MAX(position), -1) + 1 FROM entries WHERE kind = ?), ?)
+                   ON CONFLICT (kind, name) DO UPDATE SET data = excluded.data""",
+                (self.kind, name, self.kind, json.dumps(entry))
+            )
+            self._bump()
+
+    def delete(self, name, entries=None):
+        with self.conn:
+            cursor = self.conn.execute("DELETE FROM entries WHERE kind = ? AND name = ?", (self.kind, name))
+            if cursor.rowcount == 0:
+                raise KeyError(name)
+            self._bump()
+
+
+def open_stores(storage_config, poses_file, scenes_file, joint_names=None):
+    """Create the (pose store, scene store) pair selected by the storage config"""
+    backend = storage_config.get('backend', 'yaml')
+    pose_yaml = PoseYamlStore(poses_file, joint_names, storage_config.get('npz_sidecar', False))
+    if backend == 'yaml':
+        return pose_yaml, YamlStore(scenes_file)
+    if backend != 'sqlite':
+        raise ValueError(f"Unknown storage backend '{backend}' (expected 'yaml' or 'sqlite')")
+
+    db_path = Path(storage_config.get('sqlite_path') or Path(poses_file).parent / "library.db")
+    pose_store = SqliteStore(db_path, "poses")
+    scene_store = SqliteStore(db_path, "scenes")
+
+    # First run: seed the database from the YAML files
+    for store, yaml_file in ((pose_store, poses_file), (scene_store, scenes_file)):
+        if store.signature() == 0 and Path(yaml_file).exists():
+            entries = (pose_yaml if store is pose_store else YamlStore(yaml_file)).load_all()
+            store.dump_all(entries)
+            print(f"Imported {len(entries)} {store.kind} from {yaml_file} into {db_path}")
+    return pose_store, scene_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import/export the SQLite pose library from/to YAML, or migrate a pose file to v2")
+    parser.add_argument("action", choices=["import", "export", "migrate"])
+    parser.add_argument("database", help="SQLite library file (the pose file to rewrite for migrate)")
+    parser.add_argument("--poses", help="saved_poses.yaml path")
+    parser.add_argument("--scenes", help="saved_scenes.yaml path")
+    parser.add_argument("--npz", action="store_true", help="Write pose angles to a .npz sidecar")
+    args = parser.parse_args()
+
+    if args.action == "migrate":
+        store = PoseYamlStore(args.database, npz_sidecar=args.npz)
+        entries = store.load_all()
+        store.dump_all(entries)
+        print(f"Migrated {len(entries)} poses in {args.database} to format v{POSE_SCHEMA_VERSION}")
+        return
+
+    for kind, yaml_file in (("poses", args.poses), ("scenes", args.scenes)):
+        if not yaml_file:
+            continue
+        sqlite_store = SqliteStore(args.database, kind)
+        yaml_store = PoseYamlStore(yaml_file, npz_sidecar=args.npz) if kind == "poses" else YamlStore(yaml_file)
+        if args.action == "import":
+            entries = yaml_store.load_all()
+            sqlite_store.dump_all(entries)
+        else:
+            entries = sqlite_store.load_all()
+            yaml_store.dump_all(entries)
+        print(f"{args.action.capitalize()}ed {len(entries)} {kind} ({args.database} <-> {yaml_file})")
+
+
+if __name__ == "__main__":
+    main()
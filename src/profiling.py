@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Field profiling hooks for the TWIST2 joint controller
+Per-thread cProfile, a low-overhead stack sampler and periodic tracemalloc snapshots, dumped on exit or SIGUSR1
+"""
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+
+CPROFILE_THREADS = ("tk", "publisher")
+
+
+class ProfileSession:
+    """Profilers for the named controller threads, written to one output directory
+
+    Threads register themselves with profile_current(name) (or run through
+    wrap_thread()), which also lets the sampler find them. dump() can be called
+    any number of times; each call rewrites the files with everything collected
+    so far.
+
+    Files:
+        cprofile-<thread>.prof / .txt  pstats data and the top functions by cumulative time
+        samples.folded / samples.txt   sampled stacks (flamegraph.pl input) and the hottest frames
+        tracemalloc-NNN.snap           the first and latest snapshots; tracemalloc.txt compares the last one to the first
+    """
+
+    def __init__(self, output_dir, cprofile_threads=(), sample_hz=None, tracemalloc_interval=None,
+                 tracemalloc_frames=10, keep_snapshots=10):
+        self.output_dir = Path(output_dir)
+        self.cprofile_threads = tuple(cprofile_threads)
+        self.sample_hz = sample_hz
+        self.tracemalloc_interval = tracemalloc_interval
+        self.tracemalloc_frames = tracemalloc_frames
+        self.keep_snapshots = keep_snapshots  # Latest snapshots kept on disk (plus the first)
+
+        self.threads = {}    # name -> thread ident
+        self.profiles = {}   # name -> cProfile.Profile
+        self.samples = Counter()  # folded stack -> count
+        self.sample_count = 0
+        self.snapshots = 0
+
+        self._lock = threading.Lock()
+        self._dump_lock = threading.Lock()  # A SIGUSR1 dump may overlap the exit dump
+        self._stop = threading.Event()
+
+    @property
+    def active(self):
+        return bool(self.cprofile_threads or self.sample_hz or self.tracemalloc_interval)
+
+    def start(self, dump_signal=getattr(signal, 'SIGUSR1', None)):
+        """Start the sampler and tracemalloc, and dump on dump_signal (call from the main thread)"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if self.sample_hz:
+            threading.Thread(target=self._sample_loop, daemon=True).start()
+        if self.tracemalloc_interval:
+            tracemalloc.start(self.tracemalloc_frames)
+            threading.Thread(target=self._snapshot_loop, daemon=True).start()
+        if dump_signal is not None:
+            # Handlers run on the main (Tk) thread; writing the files there would stall the GUI
+            signal.signal(dump_signal, lambda signum, frame: threading.Thread(target=self.dump, daemon=True).start())
+        print(f"Profiling to {self.output_dir} (kill -USR1 {os.getpid()} to dump)")
+
+    def stop(self):
+        self._stop.set()
+        for profile in self.profiles.values():
+            profile.disable()  # Only affects the calling thread; the others are daemons
+
+    def profile_current(self, name):
+        """Register the calling thread as `name` and start its cProfile if requested"""
+        self.threads[name] = threading.get_ident()
+        if name in self.cprofile_threads:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12+ allows one active cProfile, and it sees every thread
+                print(f"⚠️  Warning: cProfile is already active; the {name} thread is included in its output")
+                return
+            self.profiles[name] = profile
+
+    def wrap_thread(self, name, target):
+        """Thread target that registers (and profiles) itself before running target"""
+        def run(*args, **kwargs):
+            self.profile_current(name)
+            return target(*args, **kwargs)
+        return run
+
+    # ==================== Sampling ====================
+
+    def _sample_loop(self):
+        interval = 1.0 / self.sample_hz
+        names = {}
+        while not self._stop.wait(interval):
+            if len(names) != len(self.threads):
+                names = {ident: name for name, ident in self.threads.items()}
+            frames = sys._current_frames()
+            with self._lock:
+                for ident, name in names.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        self.samples[self._fold(name, frame)] += 1
+                self.sample_count += 1
+            del frames
+
+    @staticmethod
+    def _fold(name, frame):
+        """One stack as "thread;outer;...;inner" (flamegraph folded format)"""
+        parts = []
+        while frame is not None:
+            code = frame.f_code
+            parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        parts.append(name)
+        return ";".join(reversed(parts))
+
+    # ==================== tracemalloc ====================
+
+    def _snapshot_loop(self):
+        while not self._stop.wait(self.tracemalloc_interval):
+            self._take_snapshot()
+
+    def _take_snapshot(self):
+        with self._lock:
+            self.snapshots += 1
+            index = self.snapshots
+        tracemalloc.take_snapshot().dump(str(self.output_dir / f"tracemalloc-{index:03d}.snap"))
+        stale = self.output_dir / f"tracemalloc-{index - self.keep_snapshots:03d}.snap"
+        if index - self.keep_snapshots > 1 and stale.exists():
+            stale.unlink()
+
+    # ==================== Output ====================
+
+    def dump(self):
+        """Write everything collected so far"""
+        with self._dump_lock:
+            self._dump()
+
+    def _dump(self):
+        try:
+            for name, profile in self.profiles.items():
+                self._dump_cprofile(name, profile)
+            if self.sample_hz:
+                self._dump_samples()
+            if self.tracemalloc_interval and tracemalloc.is_tracing():
+                self._take_snapshot()
+                self._dump_tracemalloc()
+            print(f"Profile data written to {self.output_dir}")
+        except Exception as e:
+            print(f"⚠️  Warning: Could not write profile data: {e}")
+
+    def _dump_cprofile(self, name, profile):
+        # snapshot_stats() reads the collected data without disabling the profiler,
+        # so a SIGUSR1 dump does not stop profiling of the thread it interrupts
+        profile.snapshot_stats()
+        path = self.output_dir / f"cprofile-{name}.prof"
+        with open(path, 'wb') as f:
+            marshal.dump(profile.stats, f)
+
+        text = io.StringIO()
+        stats = pstats.Stats(str(path), stream=text)
+        stats.sort_stats('cumulative').print_stats(40)
+        (self.output_dir / f"cprofile-{name}.txt").write_text(text.getvalue())
+
+    def _dump_samples(self):
+        with self._lock:
+            samples = dict(self.samples)
+            total = self.sample_count
+        with open(self.output_dir / "samples.folded", 'w') as f:
+            for stack, count in sorted(samples.items()):
+                f.write(f"{stack} {count}\n")
+
+        # Self (innermost) and total (anywhere on the stack) samples per frame
+        own, anywhere = Counter(), Counter()
+        for stack, count in samples.items():
+            parts = stack.split(";")
+            thread = parts[0]
+            own[(thread, parts[-1])] += count
+            for part in set(parts[1:]):
+                anywhere[(thread, part)] += count
+
+        lines = [f"{total} samples at {self.sample_hz:g} Hz", "", "Self samples (where time was spent):"]
+        lines += [f"  {count:>8} {100.0 * count / max(total, 1):6.1f}%  [{thread}] {frame}"
+                  for (thread, frame), count in own.most_common(30)]
+        lines += ["", "Total samples (on the stack):"]
+        lines += [f"  {count:>8} {100.0 * count / max(total, 1):6.1f}%  [{thread}] {frame}"
+                  for (thread, frame), count in anywhere.most_common(30)]
+        (self.output_dir / "samples.txt").write_text("\n".join(lines) + "\n")
+
+    def _dump_tracemalloc(self):
+        first = tracemalloc.Snapshot.load(str(self.output_dir / "tracemalloc-001.snap"))
+        last = tracemalloc.Snapshot.load(str(self.output_dir / f"tracemalloc-{self.snapshots:03d}.snap"))
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [f"Traced memory: {current / 1e6:.1f} MB (peak {peak / 1e6:.1f} MB), {self.snapshots} snapshots",
+                 "", "Top allocations (last snapshot):"]
+        lines += [f"  {stat}" for stat in last.statistics('lineno')[:25]]
+        lines += ["", "Growth since the first snapshot:"]
+        lines += [f"  {stat}" for stat in last.compare_to(first, 'lineno')[:25]]
+        (self.output_dir / "tracemalloc.txt").write_text("\n".join(lines) + "\n")
+
+
+def add_arguments(parser):
+    """Profiling options for a controller command line"""
+    group = parser.add_argument_group("profiling")
+    group.add_argument("--cprofile", nargs="?", const="all", choices=CPROFILE_THREADS + ("all",),
+                       help="cProfile the Tk thread, the publisher thread or both (default: all)")
+    group.add_argument("--sample", nargs="?", const=200.0, type=float, metavar="HZ",
+                       help="Low-overhead stack sampling of both threads (default: 200 Hz)")
+    group.add_argument("--tracemalloc", nargs="?", const=60.0, type=float, metavar="SECONDS",
+                       help="tracemalloc snapshots every SECONDS (default: 60)")
+    group.add_argument("--profile-dir", default=None,
+                       help="Output directory (default: profiles/<date-time>)")
+
+
+def session_from_args(args):
+    """ProfileSession for parsed add_arguments() options, or None if profiling is off"""
+    threads = CPROFILE_THREADS if args.cprofile == "all" else ((args.cprofile,) if args.cprofile else ())
+    output_dir = args.profile_dir or Path("profiles") / time.strftime("%Y%m%d-%H%M%S")
+    session = ProfileSession(output_dir, threads, args.sample, args.tracemalloc)
+    return session if session.active else None
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Fixed-rate scheduler for the TWIST2 publishing thread
+Ticks on absolute monotonic deadlines so the period does not drift with publish cost
+"""
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+# What to do when one or more deadlines were missed
+OVERRUN_POLICIES = ("catch_up", "skip")
+
+
+class RateScheduler:
+    """Absolute-deadline scheduler with runtime-adjustable rate and jitter stats"""
+
+    def __init__(self, rate_hz=50.0, overrun_policy="skip", max_catch_up=5, stats_window=250):
+        if overrun_policy not in OVERRUN_POLICIES:
+            raise ValueError(f"Unknown overrun policy '{overrun_policy}' (expected one of {OVERRUN_POLICIES})")
+
+        self.overrun_policy = overrun_policy
+        self.max_catch_up = max_catch_up  # Max back-to-back ticks when catching up
+
+        self._lock = threading.Lock()
+        self._period = 1.0 / float(rate_hz)
+        self._rate_hz = float(rate_hz)
+        self._next_deadline = None
+
+        # Statistics (tick start times and lateness, in seconds)
+        self._tick_times = deque(maxlen=stats_window)
+        self._lateness = deque(maxlen=stats_window)
+        self.ticks = 0
+        self.late_ticks = 0     # Ticks that started more than one period late
+        self.skipped_ticks = 0  # Ticks dropped to realign with the grid
+
+    @property
+    def rate_hz(self):
+        return self._rate_hz
+
+    @property
+    def period(self):
+        return self._period
+
+    def set_rate(self, rate_hz):
+        """Change the tick rate; takes effect from the next deadline"""
+        rate_hz = float(rate_hz)
+        if rate_hz <= 0:
+            raise ValueError("Rate must be positive")
+
+        with self._lock:
+            self._rate_hz = rate_hz
+            self._period = 1.0 / rate_hz
+            # Re-anchor so a slower rate does not wait out the old schedule
+            self._next_deadline = None
+            self._tick_times.clear()
+            self._lateness.clear()
+
+    def wait(self):
+        """Block until the next deadline; returns the deadline that was reached"""
+        with self._lock:
+            period = self._period
+            now = time.monotonic()
+            if self._next_deadline is None:
+                self._next_deadline = now
+
+            deadline = self._next_deadline
+            lateness = now - deadline
+
+            if lateness > period:
+                # One or more whole periods were missed
+                missed = int(lateness // period)
+                self.late_ticks += 1
+                if self.overrun_policy == "skip" or missed > self.max_catch_up:
+                    # Drop the missed ticks and realign to the grid
+                    deadline += missed * period
+                    self.skipped_ticks += missed
+                # catch_up: keep the old deadline, the following ticks run back-to-back
+
+            self._next_deadline = deadline + period
+
+        delay = deadline - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+        now = time.monotonic()
+        with self._lock:
+            self.ticks += 1
+            self._tick_times.append(now)
+            self._lateness.append(max(now - deadline, 0.0))
+
+        return deadline
+
+    def stats(self):
+        """Return measured rate (Hz) and jitter (ms) over the stats window"""
+        with self._lock:
+            tick_times = np.array(self._tick_times)
+            lateness = np.array(self._lateness)
+            rate_hz = self._rate_hz
+
+        result = {
+            'target_rate': rate_hz,
+            'measured_rate': 0.0,
+            'jitter_ms': 0.0,
+            'lateness_p50_ms': 0.0,
+            'lateness_p90_ms': 0.0,
+            'lateness_p99_ms': 0.0,
+            'ticks': self.ticks,
+            'late_ticks': self.late_ticks,
+            'skipped_ticks': self.skipped_ticks,
+        }
+        if len(tick_times) >= 2:
+            intervals = np.diff(tick_times)
+            span = tick_times[-1] - tick_times[0]
+            result['measured_rate'] = float(len(intervals) / span) if span > 0 else 0.0
+            result['jitter_ms'] = float(np.std(intervals) * 1000.0)
+        if len(lateness):
+            p50, p90, p99 = np.percentile(lateness, [50, 90, 99]) * 1000.0
+            result['lateness_p50_ms'] = float(p50)
+            result['lateness_p90_ms'] = float(p90)
+            result['lateness_p99_ms'] = float(p99)
+        return result
+
+
+class ChangeSuppressor:
+    """Skip frames whose joint vector did not change, but keep a heartbeat
+
+    When enabled, a frame is published immediately if any joint moved more than
+    `epsilon` since the last published frame, otherwise only once per heartbeat
+    period so the consumer's watchdog stays satisfied.
+    """
+
+    def __init__(self, num_joints, enabled=False, epsilon=1e-4, heartbeat_hz=5.0):
+        self.enabled = enabled
+        self.epsilon = epsilon
+        self.heartbeat_period = 1.0 / heartbeat_hz if heartbeat_hz > 0 else float('inf')
+
+        self._last_sent = np.zeros(num_joints)
+        self._last_sent_time = None
+        self._scratch = np.zeros(num_joints)  # Reused for the change test (no per-tick allocation)
+
+        # Counters
+        self.frames_sent = 0
+        self.frames_suppressed = 0
+
+    def should_publish(self, angles, now):
+        """Return True if this frame must be published (counts suppressed frames)"""
+        if not self.enabled or self._last_sent_time is None:
+            return True
+
+        np.subtract(angles, self._last_sent, out=self._scratch)
+        np.abs(self._scratch, out=self._scratch)
+        if self._scratch.max() > self.epsilon:
+            return True
+        if now - self._last_sent_time >= self.heartbeat_period:
+            return True
+
+        self.frames_suppressed += 1
+        return False
+
+    def mark_sent(self, angles, now):
+        """Record a successfully published frame"""
+        np.copyto(self._last_sent, angles)
+        self._last_sent_time = now
+        self.frames_sent += 1
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Publisher telemetry for the TWIST2 joint controller
+Per-frame publish costs, a combined metrics snapshot and Prometheus/JSON-lines export to a file or an HTTP port
+"""
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from pose_store import atomic_write_text
+
+
+EXPORT_FORMATS = ("prometheus", "jsonl")
+METRIC_PREFIX = "twist2_publisher_"
+
+
+class PublisherTelemetry:
+    """Rolling publish-cost samples plus counters kept by the publishing thread
+
+    record() costs two deque appends per frame; snapshot() (any thread) merges
+    them with the scheduler, Redis link and change suppressor counters into
+    one flat dict of metrics.
+    """
+
+    def __init__(self, window=250):
+        self._lock = threading.Lock()
+        self._serialize = deque(maxlen=window)  # Seconds to fill and encode a frame
+        self._rtt = deque(maxlen=window)        # Seconds per Redis write (round trip)
+        self.frames_failed = 0   # Frames no backend accepted
+        self.publish_errors = 0  # Unexpected exceptions in the publish path
+
+    def record(self, serialize_s, rtt_s=None):
+        """Add the costs of one published frame (rtt_s is None if Redis was not written)"""
+        with self._lock:
+            self._serialize.append(serialize_s)
+            if rtt_s is not None:
+                self._rtt.append(rtt_s)
+
+    def snapshot(self, scheduler, link=None, suppressor=None):
+        """Current metrics as {name: value}; *_total names are counters, the rest gauges"""
+        with self._lock:
+            serialize = np.array(self._serialize)
+            rtt = np.array(self._rtt)
+
+        stats = scheduler.stats()
+        metrics = {
+            'target_rate_hz': stats['target_rate'],
+            'measured_rate_hz': stats['measured_rate'],
+            'tick_jitter_ms': stats['jitter_ms'],
+            'tick_lateness_p50_ms': stats['lateness_p50_ms'],
+            'tick_lateness_p90_ms': stats['lateness_p90_ms'],
+            'tick_lateness_p99_ms': stats['lateness_p99_ms'],
+            'ticks_total': stats['ticks'],
+            'late_ticks_total': stats['late_ticks'],
+            'skipped_ticks_total': stats['skipped_ticks'],
+            'frames_failed_total': self.frames_failed,
+            'publish_errors_total': self.publish_errors,
+        }
+        for name, samples, scale, unit in (('serialize', serialize, 1e6, 'us'), ('redis_rtt', rtt, 1e3, 'ms')):
+            p50, p99 = np.percentile(samples, [50, 99]) * scale if len(samples) else (0.0, 0.0)
+            metrics[f'{name}_p50_{unit}'] = float(p50)
+            metrics[f'{name}_p99_{unit}'] = float(p99)
+        if link is not None:
+            metrics['redis_connected'] = int(link.connected)
+            metrics['redis_errors_total'] = link.errors
+            metrics['redis_reconnects_total'] = link.reconnects
+        if suppressor is not None:
+            metrics['frames_sent_total'] = suppressor.frames_sent
+            metrics['frames_suppressed_total'] = suppressor.frames_suppressed
+        return metrics
+
+
+def format_prometheus(metrics):
+    """Prometheus text exposition of a snapshot()"""
+    lines = []
+    for name, value in metrics.items():
+        full_name = METRIC_PREFIX + name
+        kind = "counter" if name.endswith("_total") else "gauge"
+        lines.append(f"# TYPE {full_name} {kind}")
+        lines.append(f"{full_name} {value:g}" if isinstance(value, float) else f"{full_name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def format_json_line(metrics, timestamp=None):
+    """One JSON line for a snapshot() (with a wall-clock timestamp)"""
+    record = {'time': time.time() if timestamp is None else timestamp}
+    record.update(metrics)
+    return json.dumps(record) + "\n"
+
+
+class MetricsExporter:
+    """Background export of telemetry snapshots
+
+    Every `interval` seconds collect() is called and its metrics are formatted
+    as Prometheus text (the file is rewritten atomically, e.g. for node_exporter's
+    textfile collector) or as JSON lines (appended). With a port, the latest
+    export is also served over HTTP on host:port (any path, e.g. /metrics).
+    """
+
+    def __init__(self, collect, fmt="prometheus", path=None, port=None, host="127.0.0.1", interval=1.0):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown telemetry format '{fmt}' (expected one of {EXPORT_FORMATS})")
+        self.collect = collect
+        self.fmt = fmt
+        self.path = path
+        self.interval = interval
+        self.latest = ""
+        self.errors = 0
+
+        self._stop = threading.Event()
+        self._thread = None
+        self._server = None
+        if port is not None:
+            self._server = ThreadingHTTPServer((host, int(port)), self._handler())
+            self._server.daemon_threads = True
+
+    def _handler(self):
+        exporter = self
+        content_type = "text/plain; version=0.0.4" if self.fmt == "prometheus" else "application/x-ndjson"
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = exporter.latest.encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Scrapes would flood the console
+
+        return Handler
+
+    def start(self):
+        """Start exporting (and serving, if a port was given)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._export_loop, daemon=True)
+            self._thread.start()
+            if self._server is not None:
+                threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def export_once(self):
+        """Collect and write one export"""
+        metrics = self.collect()
+        if self.fmt == "prometheus":
+            self.latest = format_prometheus(metrics)
+            if self.path:
+                atomic_write_text(self.path, self.latest)
+        else:
+            self.latest = format_json_line(metrics)
+            if self.path:
+                with open(self.path, 'a') as f:
+                    f.write(self.latest)
+
+    def _export_loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.export_once()
+            except Exception as e:
+                self.errors += 1
+                if self.errors == 1:
+                    print(f"⚠️  Warning: Telemetry export failed: {e}")
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Managed Redis connection for the TWIST2 publisher
+Pooled connections, short socket timeouts and background reconnect with exponential backoff
+"""
+import threading
+import time
+
+import redis
+from redis.backoff import NoBackoff
+from redis.retry import Retry
+
+from mimic_obs_codec import encode_frame_metadata
+
+
+# Ways a frame can be written: SET on a key (consumers poll), XADD to a capped
+# stream (history + blocking reads) and PUBLISH on a channel (event-driven)
+OUTPUT_MODES = ("set", "stream", "pubsub")
+
+
+class FrameOutput:
+    """Where and how each published frame is written to Redis"""
+
+    def __init__(self, key, modes=("set",), stream_key=None, stream_maxlen=1000,
+                 stream_approximate=True, channel=None, meta_key=None):
+        unknown = [mode for mode in modes if mode not in OUTPUT_MODES]
+        if unknown or not modes:
+            raise ValueError(f"Invalid output modes {list(modes)} (expected some of {OUTPUT_MODES})")
+
+        self.key = key
+        self.modes = tuple(modes)
+        self.stream_key = stream_key or f"{key}:stream"
+        self.stream_maxlen = stream_maxlen
+        self.stream_approximate = stream_approximate  # "MAXLEN ~" trims lazily, much cheaper
+        self.channel = channel or key
+        self.meta_key = meta_key  # Sibling key for {seq, ts}, written atomically with the frame (MSET)
+        self.set_only = self.modes == ("set",) and meta_key is None
+
+    def set_mapping(self, payload, seq, timestamp):
+        """Keys and values written by the "set" mode"""
+        if self.meta_key is None:
+            return {self.key: payload}
+        return {self.key: payload, self.meta_key: encode_frame_metadata(seq, timestamp)}
+
+    def add_to(self, pipe, payload, seq, timestamp):
+        """Queue the commands for one frame on a pipeline"""
+        if "set" in self.modes:
+            if self.meta_key is None:
+                pipe.set(self.key, payload)
+            else:
+                pipe.mset(self.set_mapping(payload, seq, timestamp))
+        if "stream" in self.modes:
+            pipe.xadd(
+                self.stream_key,
+                {"seq": seq, "ts": repr(timestamp), "data": payload},
+                maxlen=self.stream_maxlen, approximate=self.stream_approximate
+            )
+        if "pubsub" in self.modes:
+            pipe.publish(self.channel, payload)
+
+
+def create_pool(host="localhost", port=6379, db=0, unix_socket_path=None, **kwargs):
+    """Connection pool over TCP, or over a Unix domain socket when unix_socket_path is set"""
+    if unix_socket_path:
+        return redis.ConnectionPool(
+            connection_class=redis.UnixDomainSocketConnection,
+            path=str(unix_socket_path), db=db, **kwargs
+        )
+    return redis.ConnectionPool(host=host, port=port, db=db, **kwargs)
+
+
+def describe_endpoint(host="localhost", port=6379, db=0, unix_socket_path=None):
+    """Human-readable endpoint for status messages"""
+    if unix_socket_path:
+        return f"unix:{unix_socket_path}/{db}"
+    return f"{host}:{port}/{db}"
+
+
+class RedisLink:
+    """Redis connection that never blocks the publish thread on (re)connect"""
+
+    def __init__(self, host="localhost", port=6379, db=0, unix_socket_path=None, socket_timeout=0.05,
+                 connect_timeout=0.5, max_connections=4, backoff_initial=0.1, backoff_max=5.0):
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+
+        # Failed commands are not retried inline: a stalled write would stall the control loop
+        self.pool = create_pool(
+            host=host, port=port, db=db,
+            unix_socket_path=unix_socket_path,
+            max_connections=max_connections,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=connect_timeout,
+            retry=Retry(NoBackoff(), 0)
+        )
+        self.endpoint = describe_endpoint(host, port, db, unix_socket_path)
+        self.client = redis.Redis(connection_pool=self.pool)
+
+        # Live connection state (read by the GUI)
+        self.connected = False
+        self.ever_connected = False
+        self.errors = 0
+        self.reconnects = 0
+        self.last_error = None
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the background connection monitor"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._connection_loop, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """Stop the connection monitor and close pooled connections"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            # Let a ping in progress finish, so it cannot reopen a connection afterwards
+            self._thread.join(timeout)
+        self.connected = False
+        self.pool.disconnect()
+
+    def write_frame(self, output, payload, seq, timestamp):
+        """Write one frame through every mode of a FrameOutput; returns True on success"""
+        if not self.connected:
+            return False
+
+        try:
+            if output.set_only:
+                self.client.set(output.key, payload)
+            elif output.modes == ("set",):
+                self.client.mset(output.set_mapping(payload, seq, timestamp))
+            else:
+                pipe = self.client.pipeline(transaction=False)
+                output.add_to(pipe, payload, seq, timestamp)
+                pipe.execute()
+            return True
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            self.mark_disconnected(e)
+            return False
+
+    def mark_disconnected(self, error):
+        """Flag the link as down and wake the reconnect loop"""
+        self.errors += 1
+        self.last_error = error
+        if self.connected:
+            self.connected = False
+            print(f"⚠️  Warning: Lost Redis connection ({self.endpoint}): {error}")
+        self._wake.set()
+
+    def _connection_loop(self):
+        """Ping until connected, backing off exponentially; then sleep until a failure"""
+        delay = self.backoff_initial
+        while not self._stop.is_set():
+            if self.connected:
+                self._wake.wait()
+                self._wake.clear()
+                delay = self.backoff_initial
+                continue
+
+            try:
+                self.pool.disconnect()  # Drop sockets left over from the failed connection
+                self.client.ping()
+            except (redis.ConnectionError, redis.TimeoutError) as e:
+                if not self.ever_connected and delay == self.backoff_initial:
+                    print(f"⚠️  Warning: Could not connect to Redis ({self.endpoint}). Retrying in background.")
+                self.last_error = e
+                self._stop.wait(delay)
+                delay = min(delay * 2, self.backoff_max)
+                continue
+
+            if self.ever_connected:
+                self.reconnects += 1
+                print(f"✅ Reconnected to Redis ({self.endpoint})")
+            self.ever_connected = True
+            self.connected = True
+
+    def wait_connected(self, timeout):
+        """Block up to timeout seconds for the first connection (for scripts/tools)"""
+        deadline = time.monotonic() + timeout
+        while not self.connected and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self.connected
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Scene compiler for the TWIST2 joint controller
+Turns Scene Creator steps into a time-indexed piecewise trajectory that can be sampled at any time
+"""
+import numpy as np
+
+from motion_profiles import MotionLimits, shape
+from pose_math import clamp
+
+
+class SceneTimeline:
+    """Compiled scene: consecutive segments, each a linear move (or hold) between two poses
+
+    Segment k covers [starts[k], starts[k] + durations[k]) and evaluates to
+    origins[k] + deltas[k] * shape(clip((t - starts[k]) / durations[k], 0, 1)),
+    where shape is the interpolation profile (blends[k] for trapezoids).
+
+    Layout: an intro transition from the start pose to the first pose, then the
+    loop body [hold 0, move 0->1, hold 1, ..., hold n-1, move n-1->0]. A one-shot
+    play ends after the last hold (`end_time`); a looping play wraps the body
+    every `loop_period` seconds with no gap.
+    """
+
+    def __init__(self, starts, durations, origins, deltas, labels, loop_start, end_time, loop_period,
+                 profile="linear", blends=None, loads=None):
+        self.starts = starts
+        self.durations = durations
+        self.origins = origins
+        self.deltas = deltas
+        self.labels = labels  # (step_idx, phase) per segment, phase is 'moving' or 'holding'
+        self.profile = profile
+        self.blends = blends if blends is not None else np.full(len(starts), 0.25)
+        self.loads = loads if loads is not None else np.zeros(len(starts))  # Peak / limit per segment
+        self.loop_start = loop_start
+        self.end_time = end_time
+        self.loop_period = loop_period
+        self._hint = 0  # Segment found by the last lookup (playback moves forward)
+
+    @property
+    def can_loop(self):
+        return self.loop_period > 1e-6
+
+    def locate(self, t, loop):
+        """Map scene time to (local time within the first iteration, iteration, finished)"""
+        iteration = 0
+        if loop and self.can_loop and t >= self.loop_start:
+            iteration = int((t - self.loop_start) // self.loop_period)
+            t -= iteration * self.loop_period
+        if not (loop and self.can_loop) and t >= self.end_time:
+            # A zero-length loop body cannot repeat, so it plays once as well
+            return self.end_time, iteration, True
+        return max(t, 0.0), iteration, False
+
+    def segment_index(self, local_t):
+        """Index of the segment containing local_t (O(1) while playing forward)"""
+        k = self._hint
+        starts = self.starts
+        if not (starts[k] <= local_t and (k + 1 == len(starts) or local_t < starts[k + 1])):
+            if k + 1 < len(starts) and starts[k + 1] <= local_t and (k + 2 == len(starts) or local_t < starts[k + 2]):
+                k += 1
+            else:
+                k = max(int(np.searchsorted(starts, local_t, side='right')) - 1, 0)
+            self._hint = k
+        return k
+
+    def sample_local(self, local_t, out):
+        """Evaluate the trajectory at local time into out; returns the segment index"""
+        k = self.segment_index(local_t)
+        duration = self.durations[k]
+        progress = 1.0 if duration <= 0.0 else (local_t - self.starts[k]) / duration
+        np.multiply(self.deltas[k], shape(self.profile, progress, self.blends[k]), out=out)
+        out += self.origins[k]
+        return k
+
+    def segment_end(self, k):
+        """Pose reached at the end of segment k"""
+        return self.origins[k] + self.deltas[k]
+
+    def to_dense(self, rate_hz, loop=False, iterations=1):
+        """Sample the whole scene at rate_hz into a (T x 29) float32 array"""
+        total = self.end_time
+        if loop and self.can_loop:
+            total = self.loop_start + iterations * self.loop_period
+        times = np.arange(0.0, total, 1.0 / rate_hz)
+        dense = np.empty((len(times), self.origins.shape[1]), dtype=np.float32)
+        row = np.empty(self.origins.shape[1])
+        for i, t in enumerate(times):
+            local_t, _, _ = self.locate(t, loop)
+            self.sample_local(local_t, row)
+            dense[i] = row
+        return dense
+
+
+def compile_scene(steps, poses, start_angles, first_interp_time=3.0, profile="linear", limits=None):
+    """Compile scene steps ({pose_name, hold_time, interp_time}) into a SceneTimeline
+
+    poses maps pose name -> joint angles. Timing follows Scene Creator semantics:
+    the move into step i uses step i-1's interp_time (first_interp_time for the
+    first pose, the last step's interp_time when looping back). An interp_time
+    of "auto" becomes the shortest move the MotionLimits allow (see MotionLimits.plan).
+    """
+    if limits is None:
+        limits = MotionLimits()
+    if not steps:
+        raise ValueError("Scene has no steps")
+
+    # Saved poses may predate the joint limits; playback never leaves them
+    targets = [clamp(poses[step['pose_name']]) for step in steps]
+    starts, durations, origins, ends, labels, blends, loads = [], [], [], [], [], [], []
+    t = 0.0
+
+    def add_segment(origin, end, duration, label):
+        nonlocal t
+        blend, load = 0.25, 0.0
+        if label[1] == 'moving':
+            duration, blend, load = limits.plan(end - origin, duration, profile)
+        starts.append(t)
+        durations.append(duration)
+        origins.append(origin)
+        ends.append(end)
+        labels.append(label)
+        blends.append(blend)
+        loads.append(load)
+        t += duration
+
+    # Intro: from wherever the robot is to the first pose
+    add_segment(np.array(start_angles, dtype=np.float64), targets[0], first_interp_time, (0, 'moving'))
+    loop_start = t
+
+    end_time = None
+    for i, step in enumerate(steps):
+        add_segment(targets[i], targets[i], max(step.get('hold_time', 0.0), 0.0), (i, 'holding'))
+        if i == len(steps) - 1:
+            end_time = t  # One-shot playback stops after the last hold
+        # Move to the next pose (wraps to the first pose to close the loop)
+        next_idx = (i + 1) % len(steps)
+        add_segment(targets[i], targets[next_idx], step.get('interp_time', 1.0), (next_idx, 'moving'))
+
+    origins = np.array(origins)
+    return SceneTimeline(
+        starts=np.array(starts),
+        durations=np.array(durations),
+        origins=origins,
+        deltas=np.array(ends) - origins,
+        labels=labels,
+        loop_start=loop_start,
+        end_time=end_time,
+        loop_period=t - loop_start,
+        profile=profile,
+        blends=np.array(blends),
+        loads=np.array(loads),
+    )
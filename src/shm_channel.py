@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Shared-memory command channel for same-host TWIST2 consumers
+Publishes the 35-float mimic_obs into a named shared memory block guarded by a seqlock
+
+Block layout (native byte order):
+    seq         u64  even = stable, odd = write in progress; +2 per published frame
+    timestamp   f64  time.monotonic() of the write
+    generation  u64  random id of the current writer, 0 once it has stopped
+    values      f64[35]
+
+Consumer side:
+    reader = ShmCommandReader()
+    seq, timestamp, mimic_obs = reader.read()
+    if not reader.writer_active(max_age=0.1):
+        ...  # Publisher stopped or stalled: do not act on the last command
+"""
+import os
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from mimic_obs_codec import MIMIC_OBS_SIZE
+
+
+SHM_NAME = "twist2_mimic_obs"
+
+_SEQ_OFFSET = 0
+_STAMP_OFFSET = 8
+_GENERATION_OFFSET = 16
+_VALUES_OFFSET = 24
+BLOCK_SIZE = _VALUES_OFFSET + MIMIC_OBS_SIZE * 8
+
+
+def _map_block(shm):
+    """Numpy views over the seq, timestamp, generation and values fields of the block"""
+    seq = np.ndarray((1,), dtype=np.uint64, buffer=shm.buf, offset=_SEQ_OFFSET)
+    stamp = np.ndarray((1,), dtype=np.float64, buffer=shm.buf, offset=_STAMP_OFFSET)
+    generation = np.ndarray((1,), dtype=np.uint64, buffer=shm.buf, offset=_GENERATION_OFFSET)
+    values = np.ndarray((MIMIC_OBS_SIZE,), dtype=np.float64, buffer=shm.buf, offset=_VALUES_OFFSET)
+    return seq, stamp, generation, values
+
+
+class ShmCommandWriter:
+    """Single writer side of the shared-memory command channel
+
+    Each writer stamps the block with a fresh generation id, so readers can
+    tell when it was replaced, and clears it on close() so they can tell it
+    stopped. Call close() on exit: close(unlink=False) keeps the block (and the
+    readers attached to it) for the next writer to take over.
+    """
+
+    def __init__(self, name=SHM_NAME):
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=BLOCK_SIZE)
+        except FileExistsError:
+            # Left over from a previous run that did not clean up: take it over
+            self.shm = shared_memory.SharedMemory(name=name)
+            if self.shm.size < BLOCK_SIZE:
+                self.shm.close()
+                raise ValueError(f"Shared memory block '{name}' is too small ({self.shm.size} < {BLOCK_SIZE})")
+
+        self.name = name
+        self._seq, self._stamp, self._generation, self._values = _map_block(self.shm)
+        # Restart from an even (stable) sequence number
+        self._seq[0] += self._seq[0] & np.uint64(1)
+        self.generation = int.from_bytes(os.urandom(8), "little") | 1  # Never 0 (= stopped)
+        self._generation[0] = self.generation
+        self.frames_written = 0
+
+    def write(self, mimic_obs, timestamp=None):
+        """Publish one frame (seqlock: odd while writing, even when done)"""
+        self._seq[0] += np.uint64(1)
+        self._values[:] = mimic_obs
+        self._stamp[0] = time.monotonic() if timestamp is None else timestamp
+        self._seq[0] += np.uint64(1)
+        self.frames_written += 1
+
+    def close(self, unlink=True):
+        """Mark the writer stopped and release the block (removing it unless unlink=False)"""
+        self._generation[0] = 0
+        self._seq = self._stamp = self._generation = self._values = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+        else:
+            # Otherwise this process' resource tracker unlinks it at exit (with a leak warning)
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+
+
+class ShmCommandReader:
+    """Reader side of the shared-memory command channel (for TWIST2 consumers)"""
+
+    def __init__(self, name=SHM_NAME, max_retries=1000):
+        self.shm = shared_memory.SharedMemory(name=name)
+        # Attaching registers the block with this process' resource tracker, which
+        # would unlink it on exit; the writer owns the block's lifetime.
+        resource_tracker.unregister(self.shm._name, "shared_memory")
+
+        self.name = name
+        self.max_retries = max_retries
+        self._seq, self._stamp, self._generation, self._values = _map_block(self.shm)
+        self.torn_reads = 0      # Reads retried because a write was in progress
+        self.generation = None   # Writer generation of the last frame read
+        self.timestamp = None    # Publisher timestamp of the last frame read
+        self.writer_changes = 0  # Frames that came from a different writer than the one before
+
+    @property
+    def writer_stopped(self):
+        """True once the writer has closed the block"""
+        return int(self._generation[0]) == 0
+
+    def age(self, now=None):
+        """Seconds since the last frame read was published (inf before the first one)"""
+        if self.timestamp is None:
+            return float('inf')
+        return (time.monotonic() if now is None else now) - self.timestamp
+
+    def writer_active(self, max_age, now=None):
+        """True if the writer is running and the last frame read is at most max_age seconds old"""
+        return not self.writer_stopped and self.age(now) <= max_age
+
+    def reattach(self):
+        """Map the block by name again (after the writer removed it and a new one created it)"""
+        shm = shared_memory.SharedMemory(name=self.name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        self.close()
+        self.shm = shm
+        self._seq, self._stamp, self._generation, self._values = _map_block(self.shm)
+
+    def read(self, out=None):
+        """Return (seq, timestamp, mimic_obs) for the latest complete frame, or None if none yet"""
+        if out is None:
+            out = np.empty(MIMIC_OBS_SIZE)
+
+        for _ in range(self.max_retries):
+            seq_before = int(self._seq[0])
+            if seq_before & 1:
+                self.torn_reads += 1
+                time.sleep(0)  # Yield while the writer finishes
+                continue
+            out[:] = self._values
+            timestamp = float(self._stamp[0])
+            generation = int(self._generation[0])
+            if int(self._seq[0]) == seq_before:
+                if seq_before == 0:
+                    return None
+                if generation and generation != self.generation:
+                    if self.generation is not None:
+                        self.writer_changes += 1
+                    self.generation = generation
+                self.timestamp = timestamp
+                return seq_before // 2, timestamp, out
+            self.torn_reads += 1
+            time.sleep(0)
+
+        raise TimeoutError(f"Could not get a consistent read from '{self.name}'")
+
+    def wait_for_new(self, last_seq, timeout=1.0, poll_interval=0.0005):
+        """Poll until a frame newer than last_seq arrives; returns read() result or None on timeout
+
+        A block whose writer stopped is re-opened by name, so waiting survives
+        a publisher restart that recreated the block.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.writer_stopped:
+                try:
+                    self.reattach()
+                except FileNotFoundError:
+                    pass  # Not recreated (yet)
+            frame = self.read()
+            if frame is not None and frame[0] != last_seq:
+                return frame
+            time.sleep(poll_interval)
+        return None
+
+    def close(self):
+        self._seq = self._stamp = self._generation = self._values = None
+        self.shm.close()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Tk event-loop stall detector for the TWIST2 joint controller
+Times a periodic after() probe, keeps a lateness histogram and names the handler that blocked the loop
+"""
+import os
+import sys
+import threading
+import time
+import tkinter
+
+import numpy as np
+
+
+# Upper bucket edges of the lateness histogram (ms); the last bucket is open-ended
+LATENESS_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+_TKINTER_DIR = os.path.dirname(os.path.abspath(tkinter.__file__))
+
+
+def _describe(frame_summary):
+    filename, lineno, name = frame_summary
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+
+def _stack(frame):
+    """(filename, lineno, function) from the outermost to the innermost frame"""
+    stack = []
+    while frame is not None:
+        stack.append((frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _is_tkinter(filename):
+    return os.path.dirname(os.path.abspath(filename)) == _TKINTER_DIR
+
+
+def running_handler(stack):
+    """(handler, innermost frame) of a Tk thread stack, as display strings
+
+    The handler is the first frame Tk called back into (after the innermost
+    tkinter dispatch frame); the innermost frame is where it was blocked.
+    """
+    if not stack:
+        return "unknown", "unknown"
+    handler = None
+    for outer, inner in zip(stack, stack[1:]):
+        if _is_tkinter(outer[0]) and not _is_tkinter(inner[0]):
+            handler = inner
+    if handler is None:
+        handler = stack[0]
+    return _describe(handler), _describe(stack[-1])
+
+
+class TkStallWatchdog:
+    """Measures how late a periodic after() probe fires on the Tk thread
+
+    A monitor thread notices when the probe is overdue by more than
+    threshold_ms and samples the Tk thread's stack (sys._current_frames) while
+    it is still blocked. When the probe finally runs, the stall is logged with
+    that handler and added to the per-handler totals. Every probe's lateness
+    goes into the histogram.
+    """
+
+    def __init__(self, root, period_ms=50, threshold_ms=100, log=print):
+        self.root = root
+        self.period = period_ms / 1000.0
+        self.threshold = threshold_ms / 1000.0
+        self.log = log
+        self.tk_thread_id = threading.get_ident()  # Created on the Tk thread
+
+        self.counts = np.zeros(len(LATENESS_BUCKETS_MS) + 1, dtype=np.int64)
+        self.probes = 0
+        self.stalls = 0
+        self.max_lateness = 0.0
+        self.by_handler = {}  # handler -> [stalls, total seconds, worst seconds]
+
+        self._expected = None  # monotonic time the pending probe is due
+        self._sample = None    # (due time, (handler, innermost)) captured during the current stall
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Schedule the first probe and start the monitor thread"""
+        if self._thread is None:
+            self._schedule(time.monotonic())
+            self._thread = threading.Thread(target=self._monitor_loop, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _schedule(self, now):
+        self._expected = now + self.period
+        self.root.after(max(int(self.period * 1000), 1), self._probe)
+
+    def _probe(self):
+        now = time.monotonic()
+        lateness = max(now - self._expected, 0.0)
+        sample, self._sample = self._sample, None
+        if sample is not None:
+            # Ignore a sample the monitor took just after an earlier probe ran
+            sample = sample[1] if sample[0] == self._expected else None
+        self.probes += 1
+        self.counts[np.searchsorted(LATENESS_BUCKETS_MS, lateness * 1000.0)] += 1
+        self.max_lateness = max(self.max_lateness, lateness)
+
+        if lateness > self.threshold:
+            handler, innermost = sample if sample is not None else ("unknown (shorter than a monitor tick)", None)
+            self.stalls += 1
+            totals = self.by_handler.setdefault(handler, [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += lateness
+            totals[2] = max(totals[2], lateness)
+            where = f", at {innermost}" if innermost and innermost != handler else ""
+            self.log(f"⚠️  Tk stall: {lateness * 1000:.0f} ms in {handler}{where}")
+
+        if not self._stop.is_set():
+            self._schedule(now)
+
+    def _monitor_loop(self):
+        interval = max(self.threshold / 4.0, 0.005)
+        while not self._stop.wait(interval):
+            expected = self._expected
+            if expected is None or self._sample is not None:
+                continue
+            if time.monotonic() - expected > self.threshold:
+                frame = sys._current_frames().get(self.tk_thread_id)
+                self._sample = (expected, running_handler(_stack(frame)))
+                del frame
+
+    def histogram(self):
+        """[(bucket label, probes)] over LATENESS_BUCKETS_MS"""
+        labels = [f"<= {edge} ms" for edge in LATENESS_BUCKETS_MS] + [f" > {LATENESS_BUCKETS_MS[-1]} ms"]
+        return list(zip(labels, self.counts.tolist()))
+
+    def report(self):
+        """Summary of probe lateness and the handlers that stalled the loop"""
+        lines = [f"Tk event loop: {self.probes} probes, {self.stalls} stalls over "
+                 f"{self.threshold * 1000:.0f} ms, worst {self.max_lateness * 1000:.0f} ms"]
+        peak = max(int(self.counts.max()), 1)
+        for label, count in self.histogram():
+            if count:
+                lines.append(f"  {label:>12} {count:>8} {'#' * max(1, int(40 * count / peak))}")
+        for handler, (stalls, total, worst) in sorted(self.by_handler.items(), key=lambda item: -item[1][1]):
+            lines.append(f"  {total * 1000:8.0f} ms in {stalls} stall(s), worst {worst * 1000:.0f} ms: {handler}")
+        return "\n".join(lines)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for the joint state store
+Concurrent readers must never see a torn (half-committed) joint vector
+"""
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from joint_state import JointStateStore  # noqa: E402
+
+NUM_JOINTS = 29
+COMMITS = 20000
+
+
+def test_snapshots_are_never_torn():
+    store = JointStateStore(np.zeros(NUM_JOINTS))
+    done = threading.Event()
+
+    def writer():
+        # Every joint of commit k holds k, so a mix of two commits is not uniform
+        for k in range(1, COMMITS + 1):
+            store.commit(np.full(NUM_JOINTS, float(k)))
+        done.set()
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads as often as possible
+    try:
+        thread = threading.Thread(target=writer, daemon=True)
+        thread.start()
+        reads, last_version = 0, 0
+        while not done.is_set() or reads == 0:
+            version, angles = store.snapshot()
+            assert angles.shape == (NUM_JOINTS,)
+            assert np.all(angles == angles[0]), f"torn vector at version {version}: {angles}"
+            assert angles[0] == version  # Angles belong to the version they were published with
+            assert version >= last_version
+            assert not angles.flags.writeable
+            last_version = version
+            reads += 1
+        thread.join(timeout=10.0)
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert store.version == COMMITS
+    assert reads > 1
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for the mimic_obs codec
+The preallocated binary encoders must not allocate per frame
+"""
+import sys
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from mimic_obs_codec import MimicObsEncoder, decode_mimic_obs_frame  # noqa: E402
+
+FRAMES = 10000
+
+
+def _peak_growth(encode, stamp, rows):
+    """Peak traced bytes above the starting point while encoding FRAMES frames
+
+    The peak also catches garbage that is freed again within a frame, which a
+    before/after snapshot comparison misses.
+    """
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        for i in range(FRAMES):
+            stamp(i, 0.5)
+            encode(rows[i & 15])
+        return tracemalloc.get_traced_memory()[1] - start
+    finally:
+        tracemalloc.stop()
+
+
+def _noop(*args):
+    pass
+
+
+@pytest.mark.parametrize("encoding", ["f32", "f64"])
+@pytest.mark.parametrize("stamped", [False, True])
+def test_binary_encode_does_not_allocate(encoding, stamped):
+    encoder = MimicObsEncoder(encoding, stamped=stamped)
+    rows = list(np.random.default_rng(0).uniform(-1.0, 1.0, (16, 29)))
+    for i in range(100):  # Warm up (numpy and struct caches)
+        encoder.encode(rows[i & 15])
+
+    # The same loop with no-op calls: what the test loop itself allocates (loop counters)
+    overhead = _peak_growth(_noop, _noop, rows)
+    growth = _peak_growth(encoder.encode, encoder.stamp if stamped else _noop, rows)
+    assert growth - overhead <= 0, f"encode() allocated up to {growth - overhead} bytes"
+
+
+@pytest.mark.parametrize("encoding", ["f32", "f64"])
+def test_encoded_frame_round_trips(encoding):
+    encoder = MimicObsEncoder(encoding, stamped=True)
+    dof_pos = np.linspace(-1.0, 1.0, 29)
+    encoder.stamp(7, 12.5)
+    obs, seq, timestamp = decode_mimic_obs_frame(bytes(encoder.encode(dof_pos)))
+
+    assert (seq, timestamp) == (7, 12.5)
+    np.testing.assert_allclose(obs[-29:], dof_pos, rtol=1e-6 if encoding == "f32" else 0.0)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for the motion engine
+Moves, scenes and completion callbacks driven by a fake clock
+"""
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from joint_state import JointStateStore  # noqa: E402
+from motion_engine import MotionEngine  # noqa: E402
+
+NUM_JOINTS = 29
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_engine():
+    clock = FakeClock()
+    return MotionEngine(JointStateStore(np.zeros(NUM_JOINTS)), clock=clock), clock
+
+
+def tick_until(engine, clock, end, step=0.05):
+    """Tick from the clock's time to end on a worker thread; False if a tick never returned"""
+    def run():
+        while clock.now < end:
+            clock.now = round(clock.now + step, 6)
+            engine.tick(clock.now)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout=5.0)
+    return not thread.is_alive()
+
+
+def test_on_complete_can_chain_the_next_move():
+    engine, clock = make_engine()
+    first, second = np.full(NUM_JOINTS, 0.1), np.full(NUM_JOINTS, 0.2)
+    completed = []
+
+    def chain(now):
+        completed.append(now)
+        engine.move_to(second, 0.5, "second", on_complete=completed.append)
+
+    engine.move_to(first, 0.5, "first", on_complete=chain)
+    assert tick_until(engine, clock, 2.0), "tick() deadlocked in on_complete"
+
+    assert len(completed) == 2
+    assert not engine.busy
+    np.testing.assert_allclose(engine.joint_state.angles, second)
+
+
+def test_scene_without_loop_duration_finishes_when_looping():
+    engine, clock = make_engine()
+    poses = {'a': np.full(NUM_JOINTS, 0.1), 'b': np.full(NUM_JOINTS, 0.1)}
+    steps = [{'pose_name': 'a', 'hold_time': 0.0, 'interp_time': 0.0},
+             {'pose_name': 'b', 'hold_time': 0.0, 'interp_time': 0.0}]
+    engine.play_scene(steps, poses, loop=True, first_interp_time=0.5)
+    assert tick_until(engine, clock, 2.0)
+
+    events = []
+    while not engine.events.empty():
+        events.append(engine.events.get())
+    assert ('scene_finished',) in events
+    assert not engine.busy
+    np.testing.assert_allclose(engine.joint_state.angles, poses['a'])